@@ -0,0 +1,222 @@
+# aggregates.py — 브랜드/규칙별 위험도 집계 저장소 (증분 갱신 + 병합 가능)
+# -----------------------------------------------------------------------------
+# 배치 채점 결과를 append할 때마다 (brand, ruleset) 단위 집계만 갱신한다.
+#  - 문장 수 / 위험도 합계(평균) / 라벨 히스토그램
+#  - 위험도 히스토그램: risk는 0.1 단위로 반올림되므로 1001칸이면 분위수가 정확하다
+#  - 렉시콘 상위 히트: Space-Saving 요약(용량 고정, 병합 가능)
+# 원본 결과를 다시 훑지 않고 브랜드별 대시보드 질의를 ms 단위로 응답한다.
+#
+# 사용:
+#   python aggregates.py data/samples.csv --ruleset ad --store .cache/aggregates.json
+#   python aggregates.py --store .cache/aggregates.json --show 스타벅스
+# -----------------------------------------------------------------------------
+import argparse
+import csv
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import rules
+
+LABELS = ("High", "Medium", "Low")
+BINS = 1001  # risk 0.0 ~ 100.0 (0.1 단위)
+TOP_CAPACITY = 200
+# find_spans의 렉시콘 이름 → hits 그룹 이름 (두 경로의 단어 키를 통일)
+_GROUP_OF = {lex: group for group, lexs in rules.HIT_GROUPS.items() for lex in lexs}
+
+class TopTerms:
+    """Space-Saving heavy-hitters summary: 용량 이하 메모리로 상위 빈도 단어를 근사 추적."""
+
+    def __init__(self, capacity: int = TOP_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+
+    def add(self, term: str, n: int = 1) -> None:
+        c = self.counts
+        if term in c or len(c) < self.capacity:
+            c[term] = c.get(term, 0) + n
+            return
+        victim = min(c, key=c.get)
+        c[term] = c.pop(victim) + n
+
+    def merge(self, other: "TopTerms") -> None:
+        for t, n in other.counts.items():
+            self.counts[t] = self.counts.get(t, 0) + n
+        if len(self.counts) > self.capacity:
+            keep = sorted(self.counts.items(), key=lambda x: -x[1])[:self.capacity]
+            self.counts = dict(keep)
+
+    def top(self, k: int = 10) -> List[Tuple[str, int]]:
+        return sorted(self.counts.items(), key=lambda x: (-x[1], x[0]))[:k]
+
+class GroupStats:
+    """Aggregates for one (brand, ruleset) group."""
+
+    def __init__(self):
+        self.n = 0
+        self.risk_sum = 0.0
+        self.labels: Dict[str, int] = {l: 0 for l in LABELS}
+        self.hist = np.zeros(BINS, dtype=np.int64)
+        self.terms = TopTerms()
+
+    def add(self, risk: float, label: str, terms: Iterable[str] = ()) -> None:
+        self.n += 1
+        self.risk_sum += risk
+        self.labels[label] = self.labels.get(label, 0) + 1
+        self.hist[min(BINS - 1, max(0, int(round(risk * 10))))] += 1
+        for t in terms:
+            self.terms.add(t)
+
+    def merge(self, other: "GroupStats") -> None:
+        self.n += other.n
+        self.risk_sum += other.risk_sum
+        for l, c in other.labels.items():
+            self.labels[l] = self.labels.get(l, 0) + c
+        self.hist += other.hist
+        self.terms.merge(other.terms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.n == 0:
+            return None
+        cum = np.cumsum(self.hist)
+        idx = int(np.searchsorted(cum, max(1, int(np.ceil(q * self.n)))))
+        return round(idx / 10, 1)
+
+    def summary(self, top_k: int = 10) -> Dict[str, Any]:
+        return {
+            "count": self.n,
+            "mean_risk": round(self.risk_sum / self.n, 2) if self.n else None,
+            "p50": self.quantile(0.50),
+            "p90": self.quantile(0.90),
+            "p99": self.quantile(0.99),
+            "labels": dict(self.labels),
+            "high_ratio": round(self.labels.get("High", 0) / self.n, 4) if self.n else None,
+            "top_hits": self.top_hits(top_k),
+        }
+
+    def top_hits(self, k: int = 10) -> List[Tuple[str, int]]:
+        return self.terms.top(k)
+
+    def to_json(self) -> Dict[str, Any]:
+        nz = np.nonzero(self.hist)[0]
+        return {"n": self.n, "risk_sum": self.risk_sum, "labels": self.labels,
+                "hist": {str(int(i)): int(self.hist[i]) for i in nz}, "terms": self.terms.counts}
+
+    @classmethod
+    def from_json(cls, d: Dict[str, Any]) -> "GroupStats":
+        g = cls()
+        g.n, g.risk_sum, g.labels = d["n"], d["risk_sum"], dict(d["labels"])
+        for i, c in d.get("hist", {}).items():
+            g.hist[int(i)] = c
+        g.terms.counts = dict(d.get("terms", {}))
+        return g
+
+class AggregateStore:
+    """(brand, ruleset) → GroupStats. 결과를 append할 때 증분 갱신되며 다른 저장소와 병합 가능."""
+
+    def __init__(self):
+        self.groups: Dict[Tuple[str, str], GroupStats] = {}
+
+    def add_rows(self, brand: str, ruleset: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Append scored rows (analyze_text/score_batch 형식). hits가 없으면 스팬으로 계산."""
+        g = self.groups.setdefault((brand, ruleset), GroupStats())
+        eng = None
+        n = 0
+        for r in rows:
+            hits = r.get("hits")
+            if hits is None:
+                eng = eng or rules.get_engine(ruleset)
+                terms = [f"{_GROUP_OF[lex]}:{t}" for _, _, lex, t in eng.find_spans(r.get("sentence", ""))]
+            else:
+                terms = [f"{group}:{t}" for group, ts in hits.items() for t in ts]
+            # 같은 문장 안의 중복 히트는 한 번만 센다
+            g.add(float(r["risk"]), str(r["label"]), dict.fromkeys(terms))
+            n += 1
+        return n
+
+    def merge(self, other: "AggregateStore") -> None:
+        for key, g in other.groups.items():
+            self.groups.setdefault(key, GroupStats()).merge(g)
+
+    def _select(self, brand: Optional[str], ruleset: Optional[str]) -> GroupStats:
+        out = GroupStats()
+        for (b, rs), g in self.groups.items():
+            if (brand is None or b == brand) and (ruleset is None or rs == ruleset):
+                out.merge(g)
+        return out
+
+    def summary(self, brand: Optional[str] = None, ruleset: Optional[str] = None, *, top_k: int = 10) -> Dict[str, Any]:
+        """Aggregate for a brand/ruleset (None = 전체)."""
+        g = self.groups.get((brand, ruleset)) if brand is not None and ruleset is not None else None
+        return (g or self._select(brand, ruleset)).summary(top_k)
+
+    def brands(self, ruleset: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per-brand overview rows sorted by mean risk (대시보드 표)."""
+        merged: Dict[str, GroupStats] = {}
+        for (b, rs), g in self.groups.items():   # 그룹을 한 번만 훑으며 브랜드별로 병합
+            if ruleset is None or rs == ruleset:
+                merged.setdefault(b, GroupStats()).merge(g)
+        rows = []
+        for b, g in sorted(merged.items()):
+            rows.append({"brand": b, "count": g.n, "mean_risk": round(g.risk_sum / g.n, 2) if g.n else None,
+                         "p90": g.quantile(0.90), "high": g.labels.get("High", 0), "medium": g.labels.get("Medium", 0)})
+        return sorted(rows, key=lambda r: -(r["mean_risk"] or 0))
+
+    def save(self, path: str) -> None:
+        data = [{"brand": b, "ruleset": rs, **g.to_json()} for (b, rs), g in self.groups.items()]
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str) -> "AggregateStore":
+        store = cls()
+        p = Path(path)
+        if p.exists():
+            for d in json.loads(p.read_text(encoding="utf-8")):
+                store.groups[(d["brand"], d["ruleset"])] = GroupStats.from_json(d)
+        return store
+
+def ingest_csv(store: AggregateStore, path: str, ruleset: str = "ad", *, batch: int = 1000) -> int:
+    """Score a brand,sentence CSV (data/samples.csv 형식) and append it to the store."""
+    eng = rules.get_engine(ruleset)
+    by_brand: Dict[str, List[str]] = {}
+    n = 0
+
+    def flush(brand: str) -> int:
+        sents = by_brand.pop(brand, [])
+        return store.add_rows(brand, ruleset, eng.score_batch(sents, with_hits=False)) if sents else 0
+
+    with open(path, encoding="utf-8-sig") as f:
+        for r in csv.DictReader(f):
+            s = (r.get("sentence") or "").strip()
+            if not s:
+                continue
+            brand = (r.get("brand") or "").strip() or "(unknown)"
+            by_brand.setdefault(brand, []).append(s)
+            if len(by_brand[brand]) >= batch:
+                n += flush(brand)
+    for brand in list(by_brand):
+        n += flush(brand)
+    return n
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Incremental per-brand risk aggregates")
+    ap.add_argument("csv", nargs="*", help="brand,sentence CSV 파일(들)을 채점해 집계에 추가")
+    ap.add_argument("--ruleset", default="ad", choices=["ad", "report"])
+    ap.add_argument("--store", default=str(rules.ROOT / ".cache" / "aggregates.json"))
+    ap.add_argument("--show", nargs="?", const="", default=None, help="브랜드 요약 출력 (이름 생략 시 전체 목록)")
+    args = ap.parse_args(argv)
+
+    store = AggregateStore.load(args.store)
+    for path in args.csv:
+        print(f"{path}: +{ingest_csv(store, path, args.ruleset)} sentences")
+    if args.csv:
+        store.save(args.store)
+    if args.show is not None:
+        out = store.summary(args.show, args.ruleset) if args.show else store.brands(args.ruleset)
+        print(json.dumps(out, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
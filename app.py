@@ -8,7 +8,8 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import re as _re
-from rapidfuzz import fuzz
+import html as _html
+import uuid
 from PIL import Image
 from pathlib import Path
 import platform
@@ -19,13 +20,20 @@ import shap
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 
-from rules import analyze_text, W
-from llm import analyze_ad, analyze_report
-from parsers import extract_text_from_url
-from report import export_pdf
+from rules import get_engine, hits_from_spans, W
+from search_index import QueryError
+from result_store import get_store, result_key
+from ranker import select_top_k
+from jobs import get_manager, job_key, run_analysis, run_fetch_url, run_llm, run_pdf, DONE, FAILED
 
 st.set_page_config(page_title="VeriAI — 문서 신뢰도/근거 분석 AI", layout="wide")
 
+# 공용 결과 저장소(result_store)는 세션마다 얕은 복사 뷰를 준다. 세션이 뷰를 고쳐도 공유 데이터가
+# 바뀌지 않으려면 Copy-on-Write가 켜져 있어야 한다 (pandas 3부터는 항상 켜져 있음).
+# 프로세스 전역 설정이므로 라이브러리 모듈이 아니라 앱 시작 시 여기서 한 번만 켠다.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
 # ====================== 한글 폰트 설정 (최종 수정 버전) ======================
 def _setup_korean_font():
     """시스템에 맞는 한글 폰트를 찾아 matplotlib에 설정합니다. 앱이 중단되지 않도록 예외 처리를 포함합니다."""
@@ -89,7 +97,7 @@ st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # ====================== STATE ======================
 def _init_state():
-    defaults = { "ruleset": "ad", "text_input": "", "url_input": "", "url_error": "", "df": None, "k": 5, "min_risk": 40, "allowed_labels": ("High", "Medium"), "similarity_threshold": 85, "llm_results": None, }
+    defaults = { "ruleset": "ad", "text_input": "", "url_input": "", "url_error": "", "result_key": None, "k": 5, "min_risk": 40, "allowed_labels": ("High", "Medium"), "similarity_threshold": 85, "llm_results": None, "llm_stats": None, "jobs": {}, "job_errors": {}, "pdf_bytes": None, "sid": uuid.uuid4().hex, }
     for k, v in defaults.items():
         if k not in st.session_state: st.session_state[k] = v
 _init_state(); st.session_state._re_sub = _re.sub
@@ -97,24 +105,18 @@ _init_state(); st.session_state._re_sub = _re.sub
 # ====================== HELPERS ======================
 AXES = ["evidence_inverse", "vagueness", "language", "coverage", "temporal", "offset_risk"]
 AXES_KO = ["근거성(역)", "모호성", "언어적 위험", "적용범위 위험", "시점/기간 위험", "오프셋 의존도"]
-def _as_dict(x): return x if isinstance(x, dict) else {}
-def _highlight_sentence(text: str, hits_like) -> str:
-    hits = _as_dict(hits_like)
-    all_hits = []
-    for vals in hits.values():
-        if isinstance(vals, list):
-            all_hits.extend([v for v in vals if v])
-
-    if not all_hits:
-        return str(text)
-
-    uniq = sorted(set(all_hits), key=lambda x: (-len(x), x))
-    pat = "|".join(map(_re.escape, uniq))
-
-    if not pat:
-        return str(text)
-        
-    return st.session_state._re_sub(pat, lambda m: f"<mark>{m.group(0)}</mark>", str(text))
+def _highlight_sentence(text: str, spans) -> str:
+    """find_spans 문자 오프셋으로 <mark>를 삽입 (정규식 재실행 없음)."""
+    text = str(text).strip()
+    out, pos = [], 0
+    for start, end, *_ in sorted(spans or [], key=lambda x: (x[0], -(x[1] - x[0]))):
+        if start < pos:
+            continue  # 겹치는 히트는 먼저 시작한(긴) 것 우선
+        out.append(_html.escape(text[pos:start], quote=False))
+        out.append(f"<mark>{_html.escape(text[start:end], quote=False)}</mark>")
+        pos = end
+    out.append(_html.escape(text[pos:], quote=False))
+    return "".join(out)
 def _component_values(row):
     ev_inv=1-(row.get("evidence_score",0)/16);vag=(row.get("vagueness_score",0)/16);lang=(row.get("language_risk",0)/8);cov=(row.get("coverage_penalty",0)/6);tmp=(row.get("temporal_penalty",0)/4);off=float(row.get("offset_flag",0))
     return np.clip(np.array([ev_inv, vag, lang, cov, tmp, off]), 0, 1)
@@ -136,14 +138,68 @@ def score_sentence_from_features(features: dict) -> float:
     )
     return max(0, min(100, risk))
 
+# ====================== BACKGROUND JOBS ======================
+# 오래 걸리는 작업은 프로세스 공용 실행기로 보내고, 세션에는 job id만 저장한다.
+JOBS = get_manager(); STORE = get_store()
+JOB_LABELS = {"fetch": "URL 불러오기", "analyze": "분석", "llm": "LLM 분석", "pdf": "PDF 생성"}
+JOB_ERRORS = {"fetch": "URL 읽기 실패", "analyze": "분석 실패", "llm": "LLM 분석 실패", "pdf": "PDF 생성 실패"}
+
+def _submit_job(name, fn, *args, key=None, reuse=None):
+    # holder=세션 id: 같은 세션이 진행 중인 작업을 다시 제출(더블 클릭)해도 구독은 하나
+    job = JOBS.submit(name, fn, *args, key=key, reuse=reuse, holder=st.session_state.sid)
+    prev = st.session_state.jobs.get(name)
+    if prev and prev != job.id: JOBS.cancel(prev, st.session_state.sid)  # 같은 종류의 이전 요청은 대체
+    st.session_state.jobs[name] = job.id; st.session_state.job_errors.pop(name, None)
+    return job
+
+def _cancel_job(name):
+    jid = st.session_state.jobs.pop(name, None)
+    if jid: JOBS.cancel(jid, st.session_state.sid)
+
+def _set_result(key):
+    """세션이 보는 결과를 key로 교체 (이전 결과의 참조 해제; 데이터는 공용 저장소에만 있음)."""
+    old = st.session_state.result_key
+    if old is not None and tuple(old) != tuple(key): STORE.release(old, st.session_state.sid)
+    st.session_state.result_key = key; st.session_state.llm_results = None; st.session_state.llm_stats = None; st.session_state.pdf_bytes = None
+
+def _collect_jobs():
+    """완료된 작업 결과를 세션 상태에 반영 (text_input 위젯 생성 전에 호출해야 함)."""
+    for name, jid in list(st.session_state.jobs.items()):
+        job = JOBS.get(jid)
+        if job is not None and job.active: continue
+        del st.session_state.jobs[name]
+        if job is None: continue
+        if job.status == FAILED:
+            st.session_state.job_errors[name] = f"{JOB_ERRORS[name]}: {job.error}"
+            if name == "fetch": st.session_state["url_error"] = st.session_state.job_errors.pop(name)
+        elif job.status == DONE:
+            if name == "fetch": st.session_state["text_input"] = job.result; st.session_state["url_error"] = ""
+            elif name == "analyze": _set_result(job.result)
+            elif name == "llm": st.session_state.llm_results = job.result["results"]; st.session_state.llm_stats = job.result["stats"]
+            elif name == "pdf": st.session_state.pdf_bytes = job.result
+
+def _jobs_active():
+    return any(JOBS.get(j) is not None and JOBS.get(j).active for j in st.session_state.jobs.values())
+
+def _render_jobs():
+    """진행률/취소 버튼만 그린다. 폴링 중에는 이 조각만 다시 실행되고(전체 스크립트·SHAP·차트 제외),
+    작업이 모두 끝나면 한 번 전체를 재실행해 _collect_jobs가 결과를 반영하게 한다."""
+    if st.session_state.jobs and not _jobs_active(): st.rerun(); return
+    for name, jid in list(st.session_state.jobs.items()):
+        job = JOBS.get(jid)
+        if job is None or not job.active: continue
+        pc, cc = st.columns([5, 1])
+        pc.progress(job.progress, text=f"{JOB_LABELS[name]} — {job.message or '대기 중…'}")
+        cc.button("취소", key=f"cancel_{name}", on_click=_cancel_job, args=(name,), use_container_width=True)
+    for msg in st.session_state.job_errors.values(): st.error(msg)
+
+_collect_jobs()
+
 # ====================== UI LAYOUT ======================
 def on_click_fetch_url():
     url = (st.session_state.get("url_input") or "").strip()
     if not url: st.session_state["url_error"] = "URL을 입력하세요."; return
-    try:
-        with st.spinner("URL에서 본문을 불러오는 중…"): fetched = extract_text_from_url(url, max_paragraphs=16)
-        fetched = fetched.replace("\uFFFD", " "); st.session_state["text_input"] = fetched; st.session_state["url_error"] = ""
-    except Exception as e: st.session_state["url_error"] = f"URL 읽기 실패: {e}"
+    _submit_job("fetch", run_fetch_url, url, key=job_key("fetch", url))
 
 st.title("🧠 VeriAI — 문서 신뢰·근거 자동 분석"); st.caption("문장 단위 규칙 점수화 → 상위 위험문장만 LLM으로 근거/보완 제안 (ESG/광고/일반 보고서 전부 지원)")
 
@@ -174,6 +230,8 @@ with st.sidebar:
         help="LLM 분석 대상 선정 시, 내용이 유사한 문장들이 중복으로 뽑히지 않도록 제거합니다. 민감도가 높을수록 약간의 차이만 있어도 다른 문장으로 간주합니다."
     )
     st.markdown("---"); st.markdown("**LLM 사용 안내**\n- `OPENAI_API_KEY` 필요\n- 광고: ‘왜 위험인지 + 검증 쿼리’\n- 보고서: ‘무엇을 추가할지(지표/방법/인용)’")
+    ms = STORE.stats(); mb = lambda n: f"{n / 1048576:.1f}MB"
+    st.caption(f"공용 결과 저장소: {ms['entries']}개 · {mb(ms['bytes'])} / {mb(ms['cap_bytes'])} · 참조 {ms['refs']} (세션별 복사 시 {mb(ms['bytes_if_copied'])}) · 정리 {ms['evictions']}회")
 
 st.subheader("1) 텍스트/URL 입력"); col1, col2 = st.columns([2,1])
 with col1: st.text_area("문장 단위로 자동 분할/정규화합니다.", key="text_input", height=220, placeholder="분석할 텍스트를 붙여넣으세요.")
@@ -183,32 +241,41 @@ with col2:
     if st.session_state.get("url_error"): st.error(st.session_state["url_error"])
 run = st.button("🔎 분석하기", type="primary")
 
-@st.cache_data(show_spinner=False)
-def _analyze(text: str, ruleset: str): return pd.DataFrame(analyze_text(text, ruleset=ruleset))
-
 if run:
     txt = (st.session_state.text_input or "").strip()
     if not txt: st.warning("텍스트를 입력하거나 URL을 불러오세요.")
+    elif STORE.get(rkey := result_key(txt, st.session_state.ruleset)) is not None: _set_result(rkey)  # 다른 세션이 이미 분석한 결과
     else:
-        df_raw = _analyze(txt, st.session_state.ruleset); df_raw.insert(0, '번호', range(1, len(df_raw) + 1))
-        st.session_state.df = df_raw; st.session_state.llm_results = None
-
-df = st.session_state.df
+        # 보존 중인 완료 작업이라도 결과가 저장소에서 정리되었으면 재사용하지 않고 다시 분석
+        _submit_job("analyze", run_analysis, txt, st.session_state.ruleset, key=job_key("analyze", txt, st.session_state.ruleset),
+                    reuse=lambda job: job.result in STORE)
+st.fragment(run_every=0.5 if _jobs_active() else None)(_render_jobs)()
+
+entry = STORE.get(st.session_state.result_key, holder=st.session_state.sid)
+if entry is None and st.session_state.result_key is not None:
+    st.session_state.result_key = None; st.info("메모리 한도로 이전 분석 결과가 정리되었습니다. 다시 분석해 주세요.")
+df = entry.view() if entry is not None else None
+# 결과 영역은 사이드바의 현재 모드가 아니라 결과를 채점한 규칙을 따른다 (분석 후 모드를 바꿔도 일치)
+res_ruleset = entry.meta.get("ruleset", st.session_state.ruleset) if entry is not None else st.session_state.ruleset
 # ====================== OUTPUT ======================
 if isinstance(df, pd.DataFrame) and not df.empty:
     avg_risk = round(float(df["risk"].mean()), 1); high_cnt = int((df.get("label") == "High").sum())
-    c1,c2,c3,c4 = st.columns(4); c1.metric("평균 위험도",f"{avg_risk}"); c2.metric("High 문장 수",f"{high_cnt}"); c3.metric("총 문장 수",f"{len(df)}"); c4.metric("분석 모드", "환경 광고" if st.session_state.ruleset == "ad" else "일반 보고서")
+    c1,c2,c3,c4 = st.columns(4); c1.metric("평균 위험도",f"{avg_risk}"); c2.metric("High 문장 수",f"{high_cnt}"); c3.metric("총 문장 수",f"{len(df)}"); c4.metric("분석 모드", "환경 광고" if res_ruleset == "ad" else "일반 보고서")
     st.subheader("2) 결과 탐색"); tab1, tab2, tab3, tab4 = st.tabs(["개요(표)", "문장별 탐색", "시각화", "내보내기"])
 
     with tab1:
-        show = df.copy().sort_values("risk", ascending=False); q = st.text_input("문장 검색(키워드)", "")
-        if q: show = show[show["sentence"].astype(str).str.contains(q, case=False, na=False)]
+        q = st.text_input("문장 검색(키워드·조건)", "", help="입력한 문자열을 그대로(대소문자 무시) 찾습니다. 대문자 AND/OR/NOT, `필드:값`, 비교식을 쓰면 조건 검색이 됩니다. 예: `친환경 인증`, `overclaim hit AND no has_year AND risk>70`, `label:High OR vague hit`")
+        show = df
+        if q:
+            try: show = df.iloc[entry.index.search(q)]
+            except QueryError as e: st.warning(f"검색 조건 오류: {e}")
         
         rename_map = {
             "sentence": "문장", "risk": "위험도", "label": "등급",
             "evidence_score": "근거 점수", "vagueness_score": "모호성 점수"
         }
-        show.rename(columns=rename_map, inplace=True)
+        # 표시할 열만 골라 정렬 (공유 결과 전체를 복사하지 않음)
+        show = show[[c for c in ["번호", *rename_map] if c in show.columns]].sort_values("risk", ascending=False).rename(columns=rename_map)
         
         cols = ["번호", "문장", "위험도", "등급", "근거 점수", "모호성 점수"]
         cols = [c for c in cols if c in show.columns]
@@ -223,10 +290,12 @@ if isinstance(df, pd.DataFrame) and not df.empty:
         selected_num = st.selectbox("문장 선택", options=df['번호'].tolist(), format_func=lambda num: options_map[num])
         row = df[df['번호'] == selected_num].iloc[0].to_dict()
 
-        st.markdown("**원문**"); st.markdown(_highlight_sentence(row.get("sentence",""), row.get("hits")), unsafe_allow_html=True)
+        # 히트/스팬은 선택된 문장에 대해서만 계산 (점수 계산 경로에서는 생략)
+        spans = get_engine(res_ruleset).find_spans(str(row.get("sentence", "")))
+        st.markdown("**원문**"); st.markdown(_highlight_sentence(row.get("sentence",""), spans), unsafe_allow_html=True)
         a, b, c = st.columns(3); a.metric("위험도", f"{row.get('risk',0):.1f}"); b.metric("등급", str(row.get('label',''))); c.metric("근거 점수", f"{int(row.get('evidence_score',0))}/16")
         with st.expander("🔎 규칙 매칭 상세 (히트 단어 보기)"):
-            hits = _as_dict(row.get("hits"))
+            hits = hits_from_spans(spans)
             def chips(items, tone=""):
                 if not items: return
                 tone_cls = {"red":"red", "orange":"orange", "green":"green"}.get(tone, "")
@@ -306,63 +375,42 @@ if isinstance(df, pd.DataFrame) and not df.empty:
             
     with tab3:
         parts_avg=np.mean([_weighted_contrib(r) for _,r in df.iterrows()],axis=0); contrib_sorted=sorted(zip(AXES_KO,parts_avg),key=lambda x:-x[1]); top_two_risks=[item[0] for item in contrib_sorted[:2]]; st.info(f"**문서 전체의 주요 위험 요인:** {top_two_risks[0]}, {top_two_risks[1]}")
-        st.markdown("#### 문장별 위험도 분포 (Scatter Plot)"); scatter_df=df.copy(); scatter_df['요약']=scatter_df['sentence'].str.slice(0,80)+'...'; color_map={'High':'red','Medium':'orange','Low':'skyblue'}; fig_scatter=px.scatter(scatter_df,x='번호',y='risk',color='label',color_discrete_map=color_map,hover_data=['요약'],title='문장 위치별 위험도 점수',labels={'번호':'문장 번호','risk':'위험도 점수'}); st.plotly_chart(fig_scatter,use_container_width=True)
+        st.markdown("#### 문장별 위험도 분포 (Scatter Plot)"); scatter_df=df[['번호','risk','label']].assign(요약=df['sentence'].str.slice(0,80)+'...'); color_map={'High':'red','Medium':'orange','Low':'skyblue'}; fig_scatter=px.scatter(scatter_df,x='번호',y='risk',color='label',color_discrete_map=color_map,hover_data=['요약'],title='문장 위치별 위험도 점수',labels={'번호':'문장 번호','risk':'위험도 점수'}); st.plotly_chart(fig_scatter,use_container_width=True)
         st.markdown("#### 문장별 위험 요소 기여도 (Stacked Bar Chart)"); contrib_data=pd.DataFrame([_weighted_contrib(row) for _,row in df.iterrows()],columns=AXES_KO); contrib_data['번호']=contrib_data.index+1; contrib_df_melted=contrib_data.melt(id_vars='번호',var_name='위험 요소',value_name='기여도'); fig_stacked_bar=px.bar(contrib_df_melted,x='번호',y='기여도',color='위험 요소',title='각 문장의 위험도 점수 구성 요소',labels={'번호':'문장 번호','기여도':'위험도 기여도'}); st.plotly_chart(fig_stacked_bar,use_container_width=True)
 
     with tab4:
-        work = df.copy()
-        if "label" in work.columns:
-            work = work[work["label"].isin(st.session_state.allowed_labels)]
-        work = work[work["risk"] >= st.session_state.min_risk].sort_values("risk", ascending=False).reset_index(drop=True)
+        topk = select_top_k(df, st.session_state.k, min_risk=st.session_state.min_risk,
+                            allowed_labels=tuple(st.session_state.allowed_labels),
+                            similarity_threshold=st.session_state.similarity_threshold)
 
-        if work.empty:
+        if topk.empty:
             st.warning("설정 기준에 해당하는 문장이 없습니다.")
         else:
-            selected = []
-            for _, r in work.iterrows():
-                s = r["sentence"]
-                if all(fuzz.ratio(s, prev) < st.session_state.similarity_threshold for prev in selected):
-                    selected.append(s)
-                    if len(selected) >= st.session_state.k:
-                        break
-            
-            topk = work[work["sentence"].isin(selected)].copy().sort_values("risk", ascending=False)
-            
             view_cols = ["번호", "sentence", "risk", "label"]
             view = df[df['sentence'].isin(topk['sentence'].tolist())][view_cols].sort_values('risk', ascending=False)
 
-            view_display = view.copy()
-            view_display.rename(columns={"sentence": "문장", "risk": "위험도", "label": "등급"}, inplace=True)
+            view_display = view.rename(columns={"sentence": "문장", "risk": "위험도", "label": "등급"})
             st.dataframe(view_display, use_container_width=True)
             st.info("위 목록만 LLM 후처리 대상으로 사용합니다.")
 
             colx, coly = st.columns(2)
             items_list = [{"id": int(r.번호), "text": r.sentence, "risk": float(r.risk), "label": r.label} for r in view.itertuples(index=False)]
-            hashable_items = tuple(tuple(sorted(d.items())) for d in items_list)
-
-            if st.session_state.ruleset == "ad":
-                if colx.button("🔎 LLM 근거·위험 분석 실행 (광고)", use_container_width=True):
-                    try:
-                        st.session_state.llm_results = analyze_ad(hashable_items)
-                        st.success("LLM 분석 완료")
-                    except Exception as e:
-                        st.error(f"LLM 분석 실패: {e}")
-            else:
-                if colx.button("🧩 LLM 증빙 보완 제안 실행 (보고서)", use_container_width=True):
-                    try:
-                        st.session_state.llm_results = analyze_report(hashable_items)
-                        st.success("LLM 분석 완료")
-                    except Exception as e:
-                        st.error(f"LLM 분석 실패: {e}")
+            llm_label = "🔎 LLM 근거·위험 분석 실행 (광고)" if res_ruleset == "ad" else "🧩 LLM 증빙 보완 제안 실행 (보고서)"
+            if colx.button(llm_label, use_container_width=True, disabled="llm" in st.session_state.jobs):
+                _submit_job("llm", run_llm, res_ruleset, items_list, key=job_key("llm", res_ruleset, items_list))
+                st.rerun()
 
             if isinstance(st.session_state.llm_results, list) and st.session_state.llm_results:
                 st.markdown("#### LLM 결과 미리보기")
+                if stats := st.session_state.llm_stats:
+                    st.caption(f"규칙 기반 설명 {stats['rule_only']}건 · LLM 에스컬레이션 {stats['escalated']}건 / 전체 {stats['total']}건 (LLM 호출 {stats['llm_calls']}회)")
+                    if stats.get("llm_error"): st.warning(f"LLM 호출 실패 — 규칙 기반 설명으로 대체했습니다: {stats['llm_error']}")
                 id2sent = {int(r["id"]): r["text"] for r in items_list}
                 disp_data = []
                 for res in st.session_state.llm_results:
                     res_id = res.get("id")
-                    disp_item = {"번호": res_id, "문장": id2sent.get(res_id, "")}
-                    if st.session_state.ruleset == "ad":
+                    disp_item = {"번호": res_id, "문장": id2sent.get(res_id, ""), "출처": "LLM" if res.get("source") == "llm" else "규칙"}
+                    if res_ruleset == "ad":
                         disp_item["위험 사유"] = ", ".join(res.get("risk_reasons", []))
                         disp_item["상세 설명"] = res.get("explanation", "")
                     else:
@@ -373,26 +421,22 @@ if isinstance(df, pd.DataFrame) and not df.empty:
             csv = df.to_csv(index=False).encode("utf-8-sig")
             st.download_button("⬇️ 전체 결과 CSV", csv, "veriai_results.csv", "text/csv", use_container_width=True)
 
-            if coly.button("🖨️ PDF 리포트 생성", use_container_width=True):
-                with st.spinner("PDF 리포트를 생성 중입니다..."):
-                    try:
-                        summary = {
-                            "분석 모드": "환경 광고" if st.session_state.ruleset=="ad" else "일반 보고서",
-                            "평균 위험도": avg_risk,
-                            "'High' 등급 문장 수": high_cnt,
-                            "총 문장 수": len(df)
-                        }
-                        outputs = []
-                        if isinstance(st.session_state.llm_results, list):
-                            id2sent = {int(r.번호): r.sentence for r in view.itertuples(index=False)}
-                            for obj in st.session_state.llm_results:
-                                outputs.append({ "sentence": id2sent.get(int(obj.get("id")), ""), "result": obj })
-                        
-                        path = export_pdf(summary, df.to_dict("records"), outputs, path="veriai_report.pdf", visuals=None)
-                        
-                        st.success("PDF 생성 완료!")
-                        with open(path, "rb") as f:
-                            st.download_button("⬇️ PDF 다운로드", f, file_name="veriai_report.pdf", mime="application/pdf")
-                    except Exception as e:
-                        st.error(f"PDF 생성 실패: {e}", icon="🚨")
-
+            if coly.button("🖨️ PDF 리포트 생성", use_container_width=True, disabled="pdf" in st.session_state.jobs):
+                summary = {
+                    "분석 모드": "환경 광고" if res_ruleset=="ad" else "일반 보고서",
+                    "평균 위험도": avg_risk,
+                    "'High' 등급 문장 수": high_cnt,
+                    "총 문장 수": len(df)
+                }
+                outputs = []
+                if isinstance(st.session_state.llm_results, list):
+                    id2sent = {int(r.번호): r.sentence for r in view.itertuples(index=False)}
+                    for obj in st.session_state.llm_results:
+                        outputs.append({ "sentence": id2sent.get(int(obj.get("id")), ""), "result": obj })
+                st.session_state.pdf_bytes = None
+                _submit_job("pdf", run_pdf, summary, df.to_dict("records"), outputs, key=job_key("pdf", st.session_state.result_key, summary, outputs))
+                st.rerun()
+
+            if st.session_state.pdf_bytes:
+                st.success("PDF 생성 완료!")
+                st.download_button("⬇️ PDF 다운로드", st.session_state.pdf_bytes, file_name="veriai_report.pdf", mime="application/pdf")
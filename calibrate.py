@@ -0,0 +1,204 @@
+# calibrate.py — 가중치/임계값 캘리브레이션 (캐시된 특징 행렬 + 벡터화 재채점)
+# -----------------------------------------------------------------------------
+# 사용:
+#   python calibrate.py labeled.csv --ruleset ad --search random --n 20000
+#   python calibrate.py labeled.csv --ruleset report --search grid --step 0.05
+#
+# labeled.csv: sentence,label 컬럼 (label = High / Medium / Low)
+# 특징은 한 번만 추출해 .cache/calibrate/ 에 저장하고, 이후 후보 설정은
+# 구성요소 행렬과 가중치의 벡터 연산으로만 다시 채점한다. 위험도는 RuleEngine.score_features와
+# 같은 순서로 더하고 같은 방식으로 반올림하므로, 출력 JSON을 쓰면 보고된 정밀도/재현율이 그대로 나온다.
+# -----------------------------------------------------------------------------
+import argparse
+import copy
+import csv
+import hashlib
+import itertools
+import json
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+import rules
+
+LABELS = ["Low", "Medium", "High"]  # 클래스 인덱스 0/1/2
+WEIGHT_DECIMALS = 4                 # 출력 JSON의 가중치 자릿수 — 탐색도 이 값으로 반올림한 가중치로 한다
+CACHE_DIR = rules.ROOT / ".cache" / "calibrate"
+
+# ====== Labeled data & feature cache =============================================
+def load_labeled(path: str) -> Tuple[List[str], np.ndarray]:
+    norm = {l.lower(): i for i, l in enumerate(LABELS)}
+    sents, ys = [], []
+    with open(path, encoding="utf-8-sig") as f:
+        for r in csv.DictReader(f):
+            s = (r.get("sentence") or "").strip()
+            lab = (r.get("label") or "").strip().lower()
+            if not s or lab not in norm:
+                continue
+            sents.append(s)
+            ys.append(norm[lab])
+    if not sents:
+        raise ValueError(f"{path}: 'sentence,label' 행이 없습니다 (label은 High/Medium/Low).")
+    return sents, np.array(ys, dtype=np.int8)
+
+def feature_matrix(sentences: List[str], ruleset: str, *, use_cache: bool = True) -> np.ndarray:
+    """(n, 6) component matrix; 문장 목록과 규칙(regex/lexicons)이 같으면 캐시에서 읽는다."""
+    eng = rules.get_engine(ruleset)
+    h = hashlib.sha1("\n".join(sentences).encode("utf-8")).hexdigest()[:16]
+    path = CACHE_DIR / f"{ruleset}-{eng.feature_fingerprint}-{h}.npy"
+    if use_cache and path.exists():
+        return np.load(path)
+    comp = rules.component_matrix([eng.extract_features(s, with_hits=False) for s in sentences])
+    if use_cache:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        np.save(path, comp)
+    return comp
+
+# ====== Candidate generation =====================================================
+def random_weights(n: int, base: np.ndarray, *, seed: int = 0, concentration: float = 20.0) -> np.ndarray:
+    """Dirichlet samples around the current weights (합=1), plus the current weights as row 0."""
+    rng = np.random.default_rng(seed)
+    alpha = np.maximum(base / base.sum() * concentration, 0.05)
+    cand = rng.dirichlet(alpha, size=max(0, n - 1))
+    # 절반은 균등 Dirichlet로 넓게 탐색
+    half = len(cand) // 2
+    cand[:half] = rng.dirichlet(np.ones(len(base)), size=half)
+    return np.vstack([base / base.sum(), cand])
+
+def grid_weights(step: float) -> np.ndarray:
+    """All weight vectors on the simplex with the given step (예: 0.05 → 53,130개)."""
+    k = len(rules.COMPONENTS)
+    units = int(round(1 / step))
+    rows = []
+    for cuts in itertools.combinations(range(units + k - 1), k - 1):
+        prev, parts = -1, []
+        for c in cuts:
+            parts.append(c - prev - 1)
+            prev = c
+        parts.append(units + k - 2 - prev)
+        rows.append(parts)
+    return np.array(rows, dtype=np.float64) / units
+
+def threshold_pairs(high_range=(40, 95), medium_range=(10, 80), step: float = 5) -> np.ndarray:
+    highs = np.arange(high_range[0], high_range[1] + 1e-9, step)
+    meds = np.arange(medium_range[0], medium_range[1] + 1e-9, step)
+    return np.array([(h, m) for h in highs for m in meds if m < h], dtype=np.float64)
+
+# ====== Vectorized evaluation =====================================================
+def _prf(tp: np.ndarray, pred: np.ndarray, true: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(pred > 0, tp / pred, 0.0)
+        r = np.where(true > 0, tp / true, 0.0)
+        f = np.where(p + r > 0, 2 * p * r / (p + r), 0.0)
+    return p, r, f
+
+def _risk(comp: np.ndarray, wc: np.ndarray) -> np.ndarray:
+    """(n, c) risks, bit-identical to RuleEngine.score_features for each weight row.
+
+    행렬 곱(@)은 BLAS가 합산 순서를 바꿔 반올림 경계에서 ±0.1이 달라지므로 구성요소별로
+    score_features와 같은 순서(왼쪽부터)로 더한다. np.round는 x·10을 거쳐 반올림하므로 .x5 근처에서
+    파이썬 round()와 다를 수 있어, 그런 값만 round()로 다시 계산한다.
+    """
+    raw = comp[:, :1] * wc[None, :, 0]
+    for k in range(1, comp.shape[1]):
+        raw = raw + comp[:, k:k + 1] * wc[None, :, k]
+    raw = 100 * raw
+    risk = np.round(raw, 1)
+    t = raw * 10
+    near = np.abs(t - np.floor(t) - 0.5) < 1e-6
+    if near.any():
+        risk[near] = [round(float(v), 1) for v in raw[near]]
+    return np.clip(risk, 0, 100)
+
+def evaluate(comp: np.ndarray, y: np.ndarray, weights: np.ndarray, thresholds: np.ndarray, *, chunk: int = 512) -> Dict[str, Any]:
+    """Score every (weights × thresholds) config and return the macro-F1 best one.
+
+    위험도는 _risk로 계산한다 — rules.RuleEngine.score_features(score_sentence/score_batch)와 같은 값.
+    """
+    true = np.array([(y == k).sum() for k in range(len(LABELS))], dtype=np.float64)
+    present = true > 0  # 정답 데이터에 없는 라벨은 macro 평균에서 제외
+    onehot = np.stack([y == k for k in range(len(LABELS))], axis=1).astype(np.float32)  # (n, 3)
+    best = {"f1": -1.0}
+    for start in range(0, len(weights), chunk):
+        wc = weights[start:start + chunk]
+        risk = _risk(comp, wc)  # (n, c), float64 — float32로 줄이면 임계값 비교가 달라질 수 있음
+        for h, m in thresholds:
+            is_high = risk >= h
+            is_med = (risk >= m) & ~is_high
+            is_low = ~(is_high | is_med)
+            preds = (is_low, is_med, is_high)
+            tp = np.stack([onehot[:, k] @ preds[k] for k in range(3)])           # (3, c)
+            pred = np.stack([preds[k].sum(axis=0) for k in range(3)])            # (3, c)
+            _, _, f = _prf(tp, pred, true[:, None])
+            macro = f[present].mean(axis=0)
+            i = int(np.argmax(macro))
+            if macro[i] > best["f1"]:
+                best = {"f1": float(macro[i]), "weights": wc[i], "high": float(h), "medium": float(m),
+                        "tp": tp[:, i], "pred": pred[:, i]}
+    p, r, f = _prf(best["tp"], best["pred"], true)
+    best["per_label"] = {
+        LABELS[k]: {"precision": round(float(p[k]), 4), "recall": round(float(r[k]), 4),
+                    "f1": round(float(f[k]), 4), "support": int(true[k])}
+        for k in range(len(LABELS))
+    }
+    return best
+
+def baseline_metrics(comp: np.ndarray, y: np.ndarray, ruleset: str) -> Dict[str, Any]:
+    eng = rules.get_engine(ruleset)
+    th = np.array([[eng.TH.get("high", 70), eng.TH.get("medium", 40)]], dtype=np.float64)
+    return evaluate(comp, y, eng.weight_vector[None, :], th)
+
+def to_ruleset(ruleset: str, best: Dict[str, Any]) -> dict:
+    cfg = copy.deepcopy(rules.get_engine(ruleset).cfg)
+    cfg["version"] = f"{cfg.get('version', ruleset)}-calibrated"
+    # 가중치는 탐색 전에 WEIGHT_DECIMALS로 반올림되어 있다 — 다시 반올림하지 않고 평가한 값 그대로 쓴다
+    cfg["weights"] = {k: float(w) for (k, _, _), w in zip(rules.COMPONENTS, best["weights"])}
+    cfg["thresholds"] = {"high": best["high"], "medium": best["medium"]}
+    return cfg
+
+# ====== CLI =======================================================================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Calibrate ruleset weights/thresholds against a labeled CSV")
+    ap.add_argument("labeled_csv", help="sentence,label 컬럼을 가진 CSV")
+    ap.add_argument("--ruleset", default="ad", choices=["ad", "report"])
+    ap.add_argument("--search", default="random", choices=["random", "grid"])
+    ap.add_argument("--n", type=int, default=20000, help="random 탐색 시 가중치 후보 수")
+    ap.add_argument("--step", type=float, default=0.05, help="grid 탐색 시 가중치 간격")
+    ap.add_argument("--th-step", type=float, default=5, help="임계값 탐색 간격")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--out", default=None, help="출력 JSON 경로 (기본: config/<ruleset>_rules.calibrated.json)")
+    args = ap.parse_args(argv)
+
+    sents, y = load_labeled(args.labeled_csv)
+    t0 = time.perf_counter()
+    comp = feature_matrix(sents, args.ruleset, use_cache=not args.no_cache)
+    print(f"features: {comp.shape[0]} sentences in {time.perf_counter() - t0:.2f}s")
+
+    eng = rules.get_engine(args.ruleset)
+    weights = grid_weights(args.step) if args.search == "grid" else random_weights(args.n, eng.weight_vector, seed=args.seed)
+    weights = np.round(weights, WEIGHT_DECIMALS)  # 출력될 가중치 그대로 평가
+    ths = threshold_pairs(step=args.th_step)
+    t0 = time.perf_counter()
+    best = evaluate(comp, y, weights, ths)
+    dt = time.perf_counter() - t0
+    n_cfg = len(weights) * len(ths)
+    print(f"searched {n_cfg:,} configs ({len(weights):,} weights × {len(ths)} thresholds) in {dt:.2f}s "
+          f"→ {n_cfg / max(dt, 1e-9):,.0f} configs/s")
+
+    base = baseline_metrics(comp, y, args.ruleset)
+    print(f"macro-F1: current {base['f1']:.4f} → calibrated {best['f1']:.4f}")
+    for lab in LABELS:
+        b, c = base["per_label"][lab], best["per_label"][lab]
+        print(f"  {lab:<6} P {b['precision']:.3f}→{c['precision']:.3f}  R {b['recall']:.3f}→{c['recall']:.3f}  (n={c['support']})")
+
+    cfg = to_ruleset(args.ruleset, best)
+    out = Path(args.out) if args.out else rules.CONFIG_DIR / f"{args.ruleset}_rules.calibrated.json"
+    out.write_text(json.dumps(cfg, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"weights: {cfg['weights']}  thresholds: {cfg['thresholds']}")
+    print(f"wrote {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# diff.py — 버전 비교 분석: 바뀐 문장만 재채점·LLM 재검토
+# -----------------------------------------------------------------------------
+# 분기마다 같은 보고서/광고를 다시 점검할 때, 이전 분석 결과와 새 텍스트를 비교해
+#  - 그대로인 문장: 이전 점수와 LLM 판정을 그대로 승계
+#  - 수정/추가된 문장: 규칙 재채점 + (선택) LLM 재검토
+#  - 규칙 설정(가중치·임계값·렉시콘)이 이전 결과와 다르면 승계하지 않는다: 이전 문장도 현재 규칙으로
+#    다시 채점해 같은 규칙 버전끼리 비교하고, 위험 문장은 모두 LLM 재검토 대상
+# 후 변경 리포트(신규 위험, 해소된 위험, 점수 변화)를 만든다.
+#
+# 사용:
+#   python diff.py --text q1.txt --ruleset ad --save q1.json              # 최초 기준선
+#   python diff.py --prev q1.json --text q2.txt --save q2.json [--llm]    # 다음 분기
+# -----------------------------------------------------------------------------
+import argparse
+import difflib
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from rapidfuzz import fuzz, process
+
+import rules
+
+UNCHANGED, MODIFIED, ADDED, REMOVED = "unchanged", "modified", "added", "removed"
+
+def _key(s: str) -> str:
+    return re.sub(r"\s+", " ", s or "").strip()
+
+# ====== Sentence alignment =======================================================
+def align(prev: List[str], new: List[str], *, fuzzy_threshold: int = 85) -> Tuple[Dict[int, Tuple[int, str]], List[int]]:
+    """Map new sentence index → (prev index, UNCHANGED|MODIFIED); returns (mapping, removed prev indices).
+
+    1) 정규화 문장열에 SequenceMatcher로 동일 구간 정렬
+    2) 남은 문장 중 완전히 같은 것(위치 이동)은 unchanged
+    3) 나머지는 rapidfuzz 유사도가 fuzzy_threshold 이상이면 modified (1:1, 높은 점수 우선)
+    """
+    pk, nk = [_key(s) for s in prev], [_key(s) for s in new]
+    mapping: Dict[int, Tuple[int, str]] = {}
+    sm = difflib.SequenceMatcher(None, pk, nk, autojunk=False)
+    for tag, i1, i2, j1, j2 in sm.get_opcodes():
+        if tag == "equal":
+            for d in range(i2 - i1):
+                mapping[j1 + d] = (i1 + d, UNCHANGED)
+
+    used = {i for i, _ in mapping.values()}
+    free_prev: Dict[str, List[int]] = {}
+    for i, k in enumerate(pk):
+        if i not in used:
+            free_prev.setdefault(k, []).append(i)
+    for j, k in enumerate(nk):
+        if j not in mapping and free_prev.get(k):
+            i = free_prev[k].pop(0)
+            mapping[j] = (i, UNCHANGED)
+            used.add(i)
+
+    rest_prev = [i for i in range(len(pk)) if i not in used]
+    rest_new = [j for j in range(len(nk)) if j not in mapping]
+    if rest_prev and rest_new:
+        cands = []
+        for j in rest_new:
+            for choice, score, idx in process.extract(nk[j], [pk[i] for i in rest_prev], scorer=fuzz.ratio,
+                                                       score_cutoff=fuzzy_threshold, limit=3):
+                cands.append((score, j, rest_prev[idx]))
+        for score, j, i in sorted(cands, key=lambda x: -x[0]):
+            if j not in mapping and i not in used:
+                mapping[j] = (i, MODIFIED)
+                used.add(i)
+    removed = [i for i in range(len(pk)) if i not in used]
+    return mapping, removed
+
+# ====== Diff analysis =============================================================
+def _is_risky(row: Dict[str, Any], min_risk: float, allowed_labels: Tuple[str, ...]) -> bool:
+    return row.get("label") in allowed_labels and float(row.get("risk", 0)) >= min_risk
+
+def diff_analysis(
+    prev: Dict[str, Any],
+    new_text: str,
+    *,
+    ruleset: Optional[str] = None,
+    llm_fn: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+    fuzzy_threshold: int = 85,
+    min_risk: float = 40.0,
+    allowed_labels: Tuple[str, ...] = ("High", "Medium"),
+) -> Dict[str, Any]:
+    """Re-analyze new_text against a previous result ({"ruleset", "rules", "rows", "llm"}).
+
+    rows는 analyze_text 형식의 문장 행, llm은 id(1부터 시작하는 문장 번호)를 가진 LLM 판정 목록,
+    rules는 채점 당시 규칙 설정 지문(RuleEngine.config_fingerprint; 없거나 다르면 이전 점수를 승계하지 않음).
+    반환값은 다음 비교의 prev로 그대로 쓸 수 있는 result와 변경 리포트 report를 담는다.
+    """
+    ruleset = ruleset or prev.get("ruleset") or "ad"
+    eng = rules.get_engine(ruleset)
+    prev_rows: List[Dict[str, Any]] = prev.get("rows") or []
+    if prev.get("ruleset") and prev["ruleset"] != ruleset:
+        prev_rows = []  # 규칙이 다르면 승계할 점수가 없다 → 전부 재채점
+    prev_llm = {int(o["id"]): o for o in (prev.get("llm") or []) if o.get("id") is not None}
+    rules_changed = bool(prev_rows) and prev.get("rules") != eng.config_fingerprint
+    if rules_changed:
+        # 이름만 같고 설정이 다른 규칙의 점수/판정 → 이전 문장을 현재 규칙으로 다시 채점해 비교 기준을 맞춘다
+        fresh = eng.score_batch([r["sentence"] for r in prev_rows], with_hits=False)
+        prev_rows = [{**r, **f} for r, f in zip(prev_rows, fresh)]
+        prev_llm = {}
+
+    new_sents = rules.split_sentences(new_text)
+    mapping, removed = align([r["sentence"] for r in prev_rows], new_sents, fuzzy_threshold=fuzzy_threshold)
+
+    to_score = [j for j in range(len(new_sents)) if mapping.get(j, (None, ADDED))[1] != UNCHANGED]
+    scored = dict(zip(to_score, eng.score_batch([new_sents[j] for j in to_score], with_hits=False)))
+
+    rows: List[Dict[str, Any]] = []
+    llm_out: List[Dict[str, Any]] = []
+    review: List[Dict[str, Any]] = []
+    new_risks, resolved, deltas = [], [], []
+    for j, s in enumerate(new_sents):
+        i, change = mapping.get(j, (None, ADDED))
+        old = prev_rows[i] if i is not None else None
+        if change == UNCHANGED:
+            row = {**old, "sentence": s}
+            if (i + 1) in prev_llm:
+                llm_out.append({**prev_llm[i + 1], "id": j + 1})
+            elif rules_changed and _is_risky(row, min_risk, allowed_labels):
+                review.append({"id": j + 1, "text": s, "risk": float(row["risk"]), "label": row["label"]})
+        else:
+            row = scored[j]
+            if _is_risky(row, min_risk, allowed_labels):
+                review.append({"id": j + 1, "text": s, "risk": float(row["risk"]), "label": row["label"]})
+                if old is None or not _is_risky(old, min_risk, allowed_labels):
+                    new_risks.append({"id": j + 1, "sentence": s, "risk": row["risk"], "label": row["label"], "change": change})
+            elif old is not None and _is_risky(old, min_risk, allowed_labels):
+                resolved.append({"prev_id": i + 1, "sentence": old["sentence"], "new_sentence": s,
+                                 "prev_risk": old["risk"], "risk": row["risk"], "change": change})
+            if old is not None:
+                deltas.append({"id": j + 1, "prev_id": i + 1, "prev_risk": old["risk"], "risk": row["risk"],
+                               "delta": round(float(row["risk"]) - float(old["risk"]), 1),
+                               "prev_label": old.get("label"), "label": row["label"]})
+        row["번호"] = j + 1
+        row["change"] = change
+        row["prev_id"] = i + 1 if i is not None else None
+        rows.append(row)
+
+    for i in removed:
+        old = prev_rows[i]
+        if _is_risky(old, min_risk, allowed_labels):
+            resolved.append({"prev_id": i + 1, "sentence": old["sentence"], "new_sentence": None,
+                             "prev_risk": old["risk"], "risk": None, "change": REMOVED})
+
+    llm_carried, llm_sent = len(llm_out), 0
+    if llm_fn and review:
+        llm_out.extend(llm_fn(review))
+        llm_sent = len(review)
+    llm_out.sort(key=lambda o: int(o.get("id", 0)))
+
+    counts = {UNCHANGED: 0, MODIFIED: 0, ADDED: 0}
+    for r in rows:
+        counts[r["change"]] += 1
+    report = {
+        "summary": {
+            **counts,
+            REMOVED: len(removed),
+            "rescored": len(to_score) + (len(prev_rows) if rules_changed else 0),
+            "rules_changed": rules_changed,
+            "llm_sent": llm_sent,
+            "llm_carried_over": llm_carried,
+            "llm_pending": 0 if llm_fn else len(review),
+        },
+        "new_risks": new_risks,
+        "resolved_risks": resolved,
+        "score_deltas": sorted(deltas, key=lambda d: -abs(d["delta"])),
+        "pending_review": [] if llm_fn else review,
+    }
+    result = {"ruleset": ruleset, "rules": eng.config_fingerprint, "rows": rows, "llm": llm_out}
+    return {"result": result, "report": report}
+
+def initial_result(text: str, ruleset: str = "ad") -> Dict[str, Any]:
+    """First baseline in the same format diff_analysis expects as prev."""
+    return diff_analysis({"ruleset": ruleset, "rows": [], "llm": []}, text, ruleset=ruleset)["result"]
+
+# ====== CLI =======================================================================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Diff a new document version against a previous VeriAI result")
+    ap.add_argument("--prev", help="이전 결과 JSON (없으면 새 기준선 생성)")
+    ap.add_argument("--text", required=True, help="새 버전 텍스트 파일")
+    ap.add_argument("--ruleset", choices=["ad", "report"], default=None)
+    ap.add_argument("--save", help="새 결과 JSON 저장 경로 (다음 비교의 --prev)")
+    ap.add_argument("--report", help="변경 리포트 JSON 저장 경로")
+    ap.add_argument("--llm", action="store_true", help="수정/추가된 위험 문장만 LLM으로 재검토")
+    ap.add_argument("--fuzzy", type=int, default=85, help="수정 문장으로 볼 최소 유사도(0-100)")
+    args = ap.parse_args(argv)
+
+    text = Path(args.text).read_text(encoding="utf-8")
+    prev = json.loads(Path(args.prev).read_text(encoding="utf-8")) if args.prev else {"ruleset": args.ruleset or "ad", "rows": [], "llm": []}
+    llm_fn = None
+    if args.llm:
+        import llm
+        rs = args.ruleset or prev.get("ruleset") or "ad"
+        llm_fn = llm.run_ad if rs == "ad" else llm.run_report
+    out = diff_analysis(prev, text, ruleset=args.ruleset, llm_fn=llm_fn, fuzzy_threshold=args.fuzzy)
+
+    rep = out["report"]
+    print(json.dumps(rep["summary"], ensure_ascii=False))
+    print(f"new risks: {len(rep['new_risks'])}, resolved: {len(rep['resolved_risks'])}")
+    for d in rep["score_deltas"][:10]:
+        print(f"  #{d['id']:<4} {d['prev_risk']:>5} → {d['risk']:>5} ({d['delta']:+.1f})")
+    if args.save:
+        Path(args.save).write_text(json.dumps(out["result"], ensure_ascii=False, indent=1, default=str), encoding="utf-8")
+    if args.report:
+        Path(args.report).write_text(json.dumps(rep, ensure_ascii=False, indent=1, default=str), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# explain.py — 규칙 기반 즉시 설명 (명확한 문장은 LLM 호출 없이)
+# -----------------------------------------------------------------------------
+# 렉시콘 히트와 피처만으로 위험 사유가 정해지는 문장(예: vague/overclaim 히트 + 연도·수치 없음
+# → "모호어", "과장표현", "기한·지표부재")은 LLM과 같은 JSON 스키마를 규칙으로 바로 만든다.
+# 신뢰도가 낮거나 경계선(임계값 근처)·상충(근거가 있는데도 위험) 문장만 LLM으로 보낸다.
+#
+# 정책 (환경변수로 조정):
+#   VERIAI_EXPLAIN_MODE            auto(기본) | rules(LLM 미사용) | llm(전부 LLM, 기존 동작)
+#   VERIAI_EXPLAIN_MIN_CONFIDENCE  auto 모드에서 규칙 설명을 채택할 최소 신뢰도 (기본 0.7)
+#   VERIAI_EXPLAIN_MARGIN          임계값과의 거리가 이보다 가까우면 경계선으로 보고 감점 (기본 5)
+# -----------------------------------------------------------------------------
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import rules
+
+MODE = os.getenv("VERIAI_EXPLAIN_MODE", "auto")
+MIN_CONFIDENCE = float(os.getenv("VERIAI_EXPLAIN_MIN_CONFIDENCE", "0.7"))
+BOUNDARY_MARGIN = float(os.getenv("VERIAI_EXPLAIN_MARGIN", "5"))
+
+# ====== Ad (환경 광고) ============================================================
+_AD_REASON_TEXT = {
+    "모호어": "{terms} 등은 의미가 불분명한 마케팅 용어입니다. 어떤 기준으로 환경성을 주장하는지 명시해야 합니다.",
+    "과장표현": "{terms} 등 절대적·포괄적 표현은 입증 부담이 큽니다. 예외 없이 사실인지 확인하거나 표현을 한정해야 합니다.",
+    "미래시제·계획부재": "{terms} 등 미래 약속이 있으나 이행 시점·중간 목표가 제시되지 않았습니다.",
+    "범위과대": "{terms} 등 적용 범위가 지나치게 넓게 표현되었고 한정 조건이 없습니다.",
+    "오프셋의존": "{terms} 등 상쇄에 기대는 주장은 크레딧 종류·수량·검증 여부를 밝혀야 합니다.",
+    "근거부족": "인증·표준·제3자 검증·출처 등 주장을 뒷받침하는 근거가 문장에 없습니다.",
+    "기한·지표부재": "정량 지표(수치+단위)와 기준연도/목표연도가 없어 주장을 검증할 수 없습니다.",
+}
+# 근거 단어를 찾지 못한 사유용 문장 (빈 인용으로 시작하는 설명을 만들지 않도록)
+_AD_REASON_TEXT_PLAIN = {
+    "모호어": "의미가 불분명한 환경 마케팅 용어가 쓰였습니다. 어떤 기준으로 환경성을 주장하는지 명시해야 합니다.",
+    "과장표현": "절대적·포괄적 표현은 입증 부담이 큽니다. 예외 없이 사실인지 확인하거나 표현을 한정해야 합니다.",
+    "미래시제·계획부재": "미래 약속이 있으나 이행 시점·중간 목표가 제시되지 않았습니다.",
+    "범위과대": "적용 범위가 지나치게 넓게 표현되었고 한정 조건이 없습니다.",
+    "오프셋의존": "상쇄에 기대는 주장은 크레딧 종류·수량·검증 여부를 밝혀야 합니다.",
+}
+_AD_STANDARDS = {
+    "모호어": ["ISO 14021", "FTC Green Guides"],
+    "과장표현": ["FTC Green Guides", "환경성 표시·광고 관리제도"],
+    "미래시제·계획부재": ["SBTi"],
+    "범위과대": ["FTC Green Guides"],
+    "오프셋의존": ["ISO 14064", "GHG Protocol"],
+    "근거부족": ["ISO 14021"],
+    "기한·지표부재": ["GHG Protocol", "SBTi"],
+}
+
+# ====== Report (일반 보고서) ======================================================
+_REPORT_ISSUES = ("weasel word", "근거/출처 부재", "범위/대상 불명확", "기간/마일스톤 없음", "통계/표본 정보 부족")
+
+def _terms(f: Dict[str, Any], *groups: str) -> List[str]:
+    out: List[str] = []
+    for g in groups:
+        for t in f["hits"].get(g, []):
+            if t not in out:
+                out.append(t)
+    return out
+
+def _quote(terms: List[str], k: int = 3) -> str:
+    return ", ".join(f"'{t}'" for t in terms[:k])
+
+def _reason_text(reason: str, terms: List[str]) -> str:
+    if terms or reason not in _AD_REASON_TEXT_PLAIN:
+        return _AD_REASON_TEXT[reason].format(terms=_quote(terms))
+    return _AD_REASON_TEXT_PLAIN[reason]
+
+def _confidence(item: Dict[str, Any], n_hit_reasons: int, conflicting: bool, th: Dict[str, float]) -> float:
+    """Heuristic: 히트로 설명되는 사유가 많을수록 ↑, 임계값 근처·근거와 상충하면 ↓."""
+    risk = float(item.get("risk") or 0)
+    conf = 0.55 + 0.15 * min(3, n_hit_reasons)
+    if min(abs(risk - th["high"]), abs(risk - th["medium"])) < BOUNDARY_MARGIN:
+        conf -= 0.15
+    if conflicting:
+        conf -= 0.25
+    return round(max(0.1, min(0.95, conf)), 2)
+
+def explain_ad(item: Dict[str, Any], f: Dict[str, Any], eng: "rules.RuleEngine") -> Dict[str, Any]:
+    s = item["text"]
+    has_evidence = f["count_standards_method"] > 0 or f["count_third_party"] > 0 or f["has_url"] or f["has_award_or_rating"]
+    has_metric = f["has_number_unit"] or f["has_percent_change"]
+    reasons: List[Tuple[str, List[str]]] = []
+    vague = _terms(f, "vague")
+    if f["count_greenhot"]:
+        # labels_greenwashing_hot은 상세 보기 히트(hits)에 없으므로 스팬에서 직접 찾는다
+        hot = [t for _, _, _, t in eng.find_spans(s, ("labels_greenwashing_hot",))]
+        vague += [t for t in dict.fromkeys(hot) if t not in vague]
+    if vague or f["count_greenhot"]:
+        reasons.append(("모호어", vague))
+    if f["count_overclaim"]:
+        reasons.append(("과장표현", _terms(f, "overclaim")))
+    if f["count_future"] and not (f["has_year"] or f["has_time_phrase"]):
+        reasons.append(("미래시제·계획부재", _terms(f, "future")))
+    if f["count_coverage_risky"] and not f["count_coverage_clarifier"]:
+        reasons.append(("범위과대", _terms(f, "coverage_risky")))
+    if f["offset_flag"]:
+        reasons.append(("오프셋의존", _terms(f, "offset_terms")))
+    n_hit_reasons = sum(1 for _, ts in reasons if ts)   # 단어로 뒷받침되는 사유만 신뢰도에 반영
+    if not has_evidence:
+        reasons.append(("근거부족", []))
+    if not (f["has_year"] or has_metric):
+        reasons.append(("기한·지표부재", []))
+
+    needed: List[str] = []
+    if not has_metric:
+        needed.append("정량지표(tCO2e, kWh 등 수치+단위)")
+    if not f["has_year"]:
+        needed.append("기준연도/목표연도")
+    if any(r == "범위과대" for r, _ in reasons):
+        needed.append("적용범위(조직/제품/공급망)")
+    if any(r == "미래시제·계획부재" for r, _ in reasons):
+        needed.append("이행 로드맵/중간 마일스톤")
+    if f["offset_flag"]:
+        needed.append("상쇄 크레딧 종류·수량·검증기관")
+    if not has_evidence:
+        needed.append("외부검증/인증")
+
+    claim_terms = [t for _, ts in reasons for t in ts]
+    queries = [f"\"{t}\" 환경성 표시 광고 기준" for t in claim_terms[:2]] or ["(회사명) 지속가능성 보고서"]
+    queries.append("(제품명) 환경성적표지 인증")
+    standards: List[str] = []
+    for r, _ in reasons:
+        for std in _AD_STANDARDS[r]:
+            if std not in standards:
+                standards.append(std)
+
+    th = eng.TH
+    conflicting = has_evidence and item.get("label") == "High"
+    return {
+        "id": int(item["id"]),
+        "risk_reasons": [r for r, _ in reasons],
+        "explanation": " ".join(_reason_text(r, ts) for r, ts in reasons),
+        "existing_citations": re.findall(eng.RXget("url"), s) if eng.RX.get("url") else [],
+        "evidence_needed": needed,
+        "suggested_queries": queries,
+        "reference_standards": standards,
+        "confidence": _confidence(item, n_hit_reasons, conflicting, th),
+    }
+
+def explain_report(item: Dict[str, Any], f: Dict[str, Any], eng: "rules.RuleEngine") -> Dict[str, Any]:
+    s = item["text"]
+    weasel = _terms(f, "vague", "overclaim") + [w for w in eng.L("weasel") if w in s]
+    has_citation = f["has_citation_square"] or f["has_citation_year"] or f["has_doi"] or f["has_url"]
+    has_source = has_citation or f["count_standards_method"] > 0 or f["count_third_party"] > 0
+    has_metric = f["has_number_unit"] or f["has_percent_change"] or f["has_stats"]
+    issues: List[str] = []
+    n_hit_reasons = 0
+    if weasel:
+        issues.append(_REPORT_ISSUES[0]); n_hit_reasons += 1
+    if not has_source:
+        issues.append(_REPORT_ISSUES[1])
+    if f["count_coverage_risky"] and not f["count_coverage_clarifier"]:
+        issues.append(_REPORT_ISSUES[2]); n_hit_reasons += 1
+    if f["count_future"] and not (f["has_year"] or f["has_time_phrase"]):
+        issues.append(_REPORT_ISSUES[3]); n_hit_reasons += 1
+    if not has_metric:
+        issues.append(_REPORT_ISSUES[4])
+
+    metrics = [] if has_metric else ["정확한 수치+단위"]
+    if not f["has_year"]:
+        metrics.append("기준연도/기간")
+    if _REPORT_ISSUES[3] in issues:
+        metrics.append("성공기준(KPI)")
+    method = [] if f["has_stats"] else ["표본(n)/수집방법", "통계검정(p, CI)"]
+    if not f["count_standards_method"]:
+        method.append("재현 가능한 절차(SOP)")
+    figs = [] if f["has_fig_table"] else ["Table: 지표 정의/결과 요약"]
+    cites = [] if has_citation else ["핵심 선행연구/표준", "감사/검증보고서"]
+    queries = [f"\"{t}\" 정량 근거" for t in weasel[:1]] + ["(주제) 측정 방법론 선행연구"]
+
+    conflicting = has_source and has_metric and item.get("label") == "High"
+    return {
+        "id": int(item["id"]),
+        "issues": issues,
+        "what_to_add": {"metrics": metrics, "method": method, "tables_figures": figs, "citations": cites},
+        "existing_citations": re.findall(eng.RXget("url"), s) if eng.RX.get("url") else [],
+        "suggested_queries": queries,
+        "confidence": _confidence(item, n_hit_reasons, conflicting, eng.TH),
+    }
+
+def explain(item: Dict[str, Any], ruleset: str) -> Dict[str, Any]:
+    """Rule-derived result for one {"id", "text", "risk", "label"} item (LLM 응답과 같은 스키마)."""
+    eng = rules.get_engine(ruleset)
+    f = eng.extract_features(item["text"])
+    return (explain_ad if eng.name == "ad" else explain_report)(item, f, eng)
+
+# ====== Escalation policy =========================================================
+def explain_items(
+    ruleset: str,
+    items: List[Dict[str, Any]],
+    *,
+    llm_fn: Optional[Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]] = None,
+    mode: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Explain items by rules, escalating low-confidence ones to llm_fn in a single call.
+
+    반환: (id 순 결과 목록 — 각 항목에 "source": "rule" | "llm", 통계 dict)
+    LLM 호출이 실패하면 규칙 결과를 그대로 두고 stats["llm_error"]에 사유를 남긴다.
+    """
+    mode = mode or MODE
+    min_conf = MIN_CONFIDENCE if min_confidence is None else min_confidence
+    t0 = time.perf_counter()
+    by_id: Dict[int, Dict[str, Any]] = {}
+    escalate: List[Dict[str, Any]] = []
+    for it in items:
+        res = explain(it, ruleset)
+        by_id[res["id"]] = {**res, "source": "rule"}
+        if llm_fn is not None and (mode == "llm" or (mode == "auto" and res["confidence"] < min_conf)):
+            escalate.append(it)
+    rule_ms = (time.perf_counter() - t0) * 1000
+
+    stats: Dict[str, Any] = {"total": len(items), "escalated": len(escalate), "llm_calls": 0,
+                             "mode": mode, "min_confidence": min_conf, "rule_ms": round(rule_ms, 2)}
+    if escalate:
+        t1 = time.perf_counter()
+        try:
+            out = llm_fn(escalate)
+            stats["llm_calls"] = 1
+            for obj in out:
+                try:
+                    by_id[int(obj.get("id"))] = {**obj, "source": "llm"}
+                except (TypeError, ValueError):
+                    continue
+        except Exception as e:
+            stats["llm_error"] = str(e)
+        stats["llm_ms"] = round((time.perf_counter() - t1) * 1000, 1)
+    stats["rule_only"] = sum(1 for r in by_id.values() if r["source"] == "rule")
+    return [by_id[k] for k in sorted(by_id)], stats
@@ -0,0 +1,270 @@
+# ingest.py — JSONL 스트리밍 채점 데몬 (stdin 또는 감시 폴더)
+# -----------------------------------------------------------------------------
+# 상류 광고 수집 파이프라인이 떨어뜨리는 JSONL 배치를 계속 읽어 채점한다.
+#   입력 레코드:  {"id": ..., "brand": ..., "sentence": "..."}   (문장 1개)
+#                {"id": ..., "brand": ..., "text": "..."}       (전체 텍스트 → 문장 분리)
+#                 선택: "ruleset": "ad" | "report"
+#   출력(stdout): 입력 순서 그대로 한 줄에 하나씩 채점 결과 JSON
+#
+#  - 제한된 워커 풀 + 진행 중 청크 수 제한(백프레셔): 읽기가 채점보다 앞서가지 않는다
+#  - 처리 위치(파일별 바이트 오프셋 / --stdin-id로 이름 붙인 stdin 스트림의 줄 수)를 출력 후에
+#    체크포인트 → 재시작 시 중복 없음. 이름 없는 stdin은 매번 새 스트림이므로 건너뛰지 않는다
+#  - 알 수 없는 "ruleset" 값은 기본값으로 대체하지 않고 오류 레코드로 출력
+#  - stderr로 지속 처리량(sentences/sec) 보고
+#
+# 사용:
+#   cat batch.jsonl | python ingest.py --ruleset ad > scored.jsonl
+#   tail -n +1 -F feed.jsonl | python ingest.py --stdin-id feed >> scored.jsonl   # 재시작 시 이어서
+#   python ingest.py --watch incoming/ --ruleset ad >> scored.jsonl
+# -----------------------------------------------------------------------------
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import rules
+
+RULESETS = ("ad", "report")
+_EOF = object()
+
+# ====== Worker process side =======================================================
+def _worker_init() -> None:
+    for name in RULESETS:
+        rules.get_engine(name)
+
+def _score_chunk(lines: List[str], default_ruleset: str) -> Tuple[List[str], int]:
+    """Score raw JSONL lines; returns (output lines, sentence count)."""
+    out: List[str] = []
+    n_sent = 0
+    for line in lines:
+        try:
+            rec = json.loads(line)
+            if not isinstance(rec, dict):
+                raise ValueError("record must be a JSON object")
+            ruleset = rec.get("ruleset") or default_ruleset
+            if ruleset not in RULESETS:   # get_engine은 모르는 이름을 ad로 바꾸므로 여기서 거른다
+                raise ValueError(f"unknown ruleset: {ruleset}")
+            eng = rules.get_engine(ruleset)
+            meta = {k: rec[k] for k in ("id", "brand") if k in rec}
+            if isinstance(rec.get("sentence"), str):
+                row = eng.score_batch([rec["sentence"]], with_hits=False)[0]
+                res = {**meta, "ruleset": eng.name, **row}
+                n_sent += 1
+            elif isinstance(rec.get("text"), str):
+                rows = eng.analyze_text(rec["text"], with_hits=False)
+                res = {**meta, "ruleset": eng.name, "sentences": rows,
+                       "avg_risk": round(sum(r["risk"] for r in rows) / len(rows), 1) if rows else None,
+                       "high_cnt": sum(1 for r in rows if r["label"] == "High")}
+                n_sent += len(rows)
+            else:
+                raise ValueError("record needs a 'sentence' or 'text' string")
+        except Exception as e:
+            res = {"error": str(e), "raw": line[:200]}
+        out.append(json.dumps(res, ensure_ascii=False))
+    return out, n_sent
+
+# ====== Checkpoint ================================================================
+class Checkpoint:
+    """Processed position per source: 'stdin:<id>' → 줄 수, 파일 경로 → 바이트 오프셋."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = Path(path) if path else None
+        self.pos: Dict[str, int] = {}
+        if self.path and self.path.exists():
+            self.pos = json.loads(self.path.read_text(encoding="utf-8"))
+        self._dirty = False
+        self._last_save = 0.0
+
+    def get(self, source: str) -> int:
+        return int(self.pos.get(source, 0))
+
+    def advance(self, source: str, pos: int) -> None:
+        if pos > self.pos.get(source, 0):
+            self.pos[source] = pos
+            self._dirty = True
+
+    def save(self, *, force: bool = False, every: float = 1.0) -> None:
+        if not (self.path and self._dirty) or (not force and time.time() - self._last_save < every):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.pos, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)  # 원자적 교체
+        self._dirty = False
+        self._last_save = time.time()
+
+# ====== Sources (reader threads → bounded queue) ==================================
+def _read_stdin(q: "queue.Queue", ckpt: Checkpoint, stream_id: Optional[str] = None) -> None:
+    # 이름 없는 stdin은 실행마다 다른 입력일 수 있으므로 체크포인트하지 않는다 (source=None).
+    # 같은 스트림을 이어 읽는 호출자만 --stdin-id로 이름을 붙여 이미 출력한 줄을 건너뛴다.
+    source = f"stdin:{stream_id}" if stream_id else None
+    skip = ckpt.get(source) if source else 0
+    n = 0
+    for line in sys.stdin:
+        n += 1
+        if n <= skip:
+            continue  # 지난 실행에서 이미 출력한 줄
+        q.put((source, n, line if line.strip() else None))
+    q.put(_EOF)
+
+def _watch_dir(q: "queue.Queue", ckpt: Checkpoint, folder: Path, pattern: str, poll: float, once: bool) -> None:
+    # 읽은 위치(큐에 넣은 곳까지)는 체크포인트(출력까지 끝난 곳)와 따로 관리한다.
+    # 체크포인트는 처음 본 파일의 시작 위치로만 쓴다 — 아직 처리 중인 줄을 다시 읽지 않도록.
+    read_pos: Dict[str, int] = {}
+    while True:
+        for path in sorted(folder.glob(pattern)):
+            key = str(path.resolve())
+            if key not in read_pos:
+                read_pos[key] = ckpt.get(key)
+            pos = read_pos[key]
+            try:
+                if path.stat().st_size <= pos:
+                    continue
+                with open(path, "rb") as f:
+                    f.seek(pos)
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            break  # 쓰는 중인 마지막 줄은 다음 폴링에서
+                        pos += len(raw)
+                        line = raw.decode("utf-8", "replace")
+                        q.put((key, pos, line if line.strip() else None))
+                        read_pos[key] = pos
+            except OSError:
+                continue
+        if once:
+            q.put(_EOF)
+            return
+        time.sleep(poll)
+
+# ====== Pipeline ==================================================================
+class Ingestor:
+    def __init__(self, *, ruleset: str, workers: int, chunk: int, max_inflight: int, ckpt: Checkpoint,
+                 out=sys.stdout, report_every: float = 10.0, idle_flush: float = 0.2):
+        self.ruleset = ruleset
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_worker_init)
+        self.chunk = chunk
+        self.max_inflight = max_inflight
+        self.ckpt = ckpt
+        self.out = out
+        self.report_every = report_every
+        self.idle_flush = idle_flush
+        self.window: deque = deque()
+        self.started = time.time()
+        self.records = 0
+        self.sentences = 0
+        self._last_report = self.started
+        self._last_sentences = 0
+
+    def _submit(self, batch: List[Tuple[Optional[str], int, Optional[str]]]) -> None:
+        # 백프레셔: 진행 중 청크가 가득 차면 가장 오래된 청크를 끝낼 때까지 기다린다
+        while len(self.window) >= self.max_inflight:
+            self._emit(self.window.popleft())
+        lines = [line for _, _, line in batch if line is not None]
+        fut = self.pool.submit(_score_chunk, lines, self.ruleset) if lines else None
+        marks: Dict[str, int] = {}
+        for src, pos, _ in batch:
+            if src is not None:     # 이름 없는 stdin은 위치를 남기지 않음
+                marks[src] = pos
+        self.window.append((marks, fut))
+
+    def _emit(self, item: Tuple[Dict[str, int], Optional[Future]]) -> None:
+        marks, fut = item
+        if fut is not None:
+            lines, n_sent = fut.result()
+            if lines:
+                self.out.write("\n".join(lines) + "\n")
+                self.out.flush()
+            self.records += len(lines)
+            self.sentences += n_sent
+        # 출력이 끝난 뒤에만 위치를 전진 → 재시작 시 중복/유실 없음
+        for src, pos in marks.items():
+            self.ckpt.advance(src, pos)
+        self.ckpt.save()
+        self._maybe_report()
+
+    def _drain_ready(self) -> None:
+        while self.window and (self.window[0][1] is None or self.window[0][1].done()):
+            self._emit(self.window.popleft())
+
+    def _maybe_report(self, *, force: bool = False) -> None:
+        now = time.time()
+        if not force and now - self._last_report < self.report_every:
+            return
+        total = now - self.started
+        recent = (self.sentences - self._last_sentences) / max(1e-9, now - self._last_report)
+        print(f"[ingest] records={self.records} sentences={self.sentences} "
+              f"rate={self.sentences / max(1e-9, total):.1f}/s (recent {recent:.1f}/s) inflight={len(self.window)}",
+              file=sys.stderr, flush=True)
+        self._last_report, self._last_sentences = now, self.sentences
+
+    def run(self, q: "queue.Queue") -> None:
+        batch: List[Tuple[Optional[str], int, Optional[str]]] = []
+        try:
+            while True:
+                try:
+                    item = q.get(timeout=self.idle_flush)
+                except queue.Empty:
+                    # 입력이 잠잠하면 모인 것만이라도 보내고 완료분을 출력
+                    if batch:
+                        self._submit(batch)
+                        batch = []
+                    self._drain_ready()
+                    continue
+                if item is _EOF:
+                    break
+                batch.append(item)
+                if len(batch) >= self.chunk:
+                    self._submit(batch)
+                    batch = []
+                    self._drain_ready()
+            if batch:
+                self._submit(batch)
+            while self.window:
+                self._emit(self.window.popleft())
+        finally:
+            self.ckpt.save(force=True)
+            self._maybe_report(force=True)
+            self.pool.shutdown(cancel_futures=True)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Stream-score JSONL claims from stdin or a watched folder")
+    ap.add_argument("--watch", help="JSONL 파일이 떨어지는 폴더 (없으면 stdin)")
+    ap.add_argument("--pattern", default="*.jsonl")
+    ap.add_argument("--stdin-id", default=None,
+                    help="stdin 스트림 이름: 지정하면 이 이름으로 처리 위치를 체크포인트하고 재시작 시 이어 읽음 "
+                         "(생략하면 stdin은 매번 처음부터)")
+    ap.add_argument("--once", action="store_true", help="--watch: 현재 파일만 처리하고 종료")
+    ap.add_argument("--poll", type=float, default=1.0, help="--watch: 폴링 간격(초)")
+    ap.add_argument("--ruleset", default="ad", choices=RULESETS, help="레코드에 ruleset이 없을 때 기본값")
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    ap.add_argument("--chunk", type=int, default=256, help="워커로 보내는 레코드 묶음 크기")
+    ap.add_argument("--max-inflight", type=int, default=None, help="동시에 처리 중인 최대 청크 수 (기본: workers×2)")
+    ap.add_argument("--state", default=str(rules.ROOT / ".cache" / "ingest_state.json"), help="처리 위치 체크포인트 파일")
+    ap.add_argument("--report-every", type=float, default=10.0, help="처리량 보고 간격(초)")
+    args = ap.parse_args(argv)
+
+    ckpt = Checkpoint(args.state)
+    max_inflight = args.max_inflight or args.workers * 2
+    # 읽기 큐도 제한: 채점이 밀리면 읽기 스레드가 멈춘다
+    q: "queue.Queue" = queue.Queue(maxsize=args.chunk * max_inflight)
+    if args.watch:
+        reader = threading.Thread(target=_watch_dir, args=(q, ckpt, Path(args.watch), args.pattern, args.poll, args.once), daemon=True)
+    else:
+        reader = threading.Thread(target=_read_stdin, args=(q, ckpt, args.stdin_id), daemon=True)
+    reader.start()
+    ing = Ingestor(ruleset=args.ruleset, workers=args.workers, chunk=args.chunk, max_inflight=max_inflight,
+                   ckpt=ckpt, report_every=args.report_every)
+    try:
+        ing.run(q)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
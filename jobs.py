@@ -0,0 +1,214 @@
+# jobs.py — 프로세스 공용 백그라운드 작업 실행기 (Streamlit 세션 간 공유)
+# -----------------------------------------------------------------------------
+# Streamlit 스크립트 재실행 안에서 오래 걸리는 작업(분석/URL/LLM/PDF)을 직접 돌리지 않고
+# 공용 스레드 풀에 제출한다. 세션은 job id만 들고 있다가 진행률을 폴링한다.
+#  - 같은 key의 작업이 이미 진행 중이면(다른 세션 포함) 새로 만들지 않고 합류
+#  - 구독자는 세션 id(holder) 집합: 같은 세션이 다시 제출해도 구독이 늘지 않는다
+#  - 취소는 구독 세션이 모두 취소했을 때만 실제로 중단(협조적 취소)
+# -----------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
+
+import pandas as pd
+
+import rules
+
+if TYPE_CHECKING:
+    from result_store import ResultKey
+
+MAX_WORKERS = int(os.getenv("VERIAI_JOB_WORKERS", "4"))
+RETAIN_SECONDS = float(os.getenv("VERIAI_JOB_RETAIN_SECONDS", "600"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+class JobCancelled(Exception):
+    pass
+
+class Job:
+    def __init__(self, kind: str, key: Optional[str], holder: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.subscribers: Set[str] = {holder}
+        self._cancel = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def report(self, progress: float, message: str = "") -> None:
+        """Called by the work function; 취소 요청이 있으면 여기서 중단된다."""
+        self.check()
+        self.progress = max(0.0, min(1.0, progress))
+        if message:
+            self.message = message
+
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+class JobManager:
+    def __init__(self, max_workers: int = MAX_WORKERS, retain_seconds: float = RETAIN_SECONDS):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="veriai-job")
+        self.retain = retain_seconds
+        self.jobs: Dict[str, Job] = {}
+        self.by_key: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, key: Optional[str] = None,
+               reuse: Optional[Callable[[Job], bool]] = None, holder: Optional[str] = None) -> Job:
+        """Run fn(job, *args) in the background; 같은 key가 진행 중/완료 보존 중이면 그 작업을 반환.
+
+        reuse: 완료된 작업을 다시 써도 되는지 판단 (예: 결과가 저장소에서 정리되었으면 False → 새로 실행).
+        holder: 구독자 id (세션 id). 이미 구독 중인 holder의 재제출은 구독을 늘리지 않는다;
+                생략하면 호출마다 별개의 구독자로 센다.
+        """
+        holder = holder or uuid.uuid4().hex
+        with self.lock:
+            self._prune()
+            if key and key in self.by_key:
+                job = self.jobs.get(self.by_key[key])
+                if job and (job.active or (job.status == DONE and (reuse is None or reuse(job)))):
+                    if job.active:
+                        job.subscribers.add(holder)
+                    return job
+            job = Job(kind, key, holder)
+            self.jobs[job.id] = job
+            if key:
+                self.by_key[key] = job.id
+        self.pool.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple) -> None:
+        if job._cancel.is_set():
+            job.status, job.finished = CANCELLED, time.time()
+            return
+        job.status = RUNNING
+        try:
+            job.result = fn(job, *args)
+            job.progress = 1.0
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        return self.jobs.get(job_id) if job_id else None
+
+    def cancel(self, job_id: str, holder: Optional[str] = None) -> None:
+        """Drop holder's subscription (None이면 임의의 하나); 마지막 구독자가 취소하면 작업을 중단한다."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or not job.active:
+                return
+            if holder is None:
+                if job.subscribers:
+                    job.subscribers.pop()
+            else:
+                job.subscribers.discard(holder)
+            if not job.subscribers:
+                job._cancel.set()
+                if self.by_key.get(job.key) == job.id:
+                    del self.by_key[job.key]
+
+    def _prune(self) -> None:
+        now = time.time()
+        for jid in [j.id for j in self.jobs.values() if j.finished and now - j.finished > self.retain]:
+            job = self.jobs.pop(jid)
+            if job.key and self.by_key.get(job.key) == jid:
+                del self.by_key[job.key]
+
+    def stats(self) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for j in list(self.jobs.values()):
+            out[j.status] = out.get(j.status, 0) + 1
+        return out
+
+_MANAGER: Optional[JobManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+def get_manager() -> JobManager:
+    """Process-wide manager (Streamlit 재실행/세션과 무관하게 하나)."""
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            _MANAGER = JobManager()
+        return _MANAGER
+
+def job_key(kind: str, *parts: Any) -> str:
+    raw = json.dumps([kind, *parts], ensure_ascii=False, sort_keys=True, default=str)
+    return f"{kind}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+# ====== Work functions ============================================================
+def run_analysis(job: Job, text: str, ruleset: str, chunk: int = 200) -> "ResultKey":
+    """Score text, build its search index and put both in the shared result store; returns the store key."""
+    from result_store import get_store, result_key
+    from search_index import SentenceIndex
+    store = get_store()
+    key = result_key(text, ruleset)
+    if store.get(key) is not None:
+        return key
+    eng = rules.get_engine(ruleset)
+    job.report(0.0, "문장 분리 중…")
+    sents = rules.split_sentences(text)
+    rows: List[Dict[str, Any]] = []
+    for i in range(0, len(sents), chunk):
+        job.report(0.9 * i / max(1, len(sents)), f"{i}/{len(sents)} 문장 채점 중…")
+        rows.extend(eng.score_batch(sents[i:i + chunk], with_hits=False))
+    job.report(0.9, "검색 색인 생성 중…")
+    index = SentenceIndex()
+    index.add(rows, ruleset=ruleset)
+    df = pd.DataFrame(rows)
+    df.insert(0, "번호", range(1, len(df) + 1))
+    # 작업 결과에는 키만 남긴다 (완료 작업 보존 기간 동안 DataFrame이 중복 보관되지 않도록)
+    store.put(key, df, index, ruleset=ruleset)
+    return key
+
+def run_fetch_url(job: Job, url: str, max_paragraphs: int = 16) -> str:
+    from parsers import extract_text_from_url
+    job.report(0.1, "URL에서 본문을 불러오는 중…")
+    return extract_text_from_url(url, max_paragraphs=max_paragraphs).replace("\uFFFD", " ")
+
+def run_llm(job: Job, ruleset: str, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rule-derived explanations first; only low-confidence items go to the LLM (see explain.py)."""
+    import explain
+    job.report(0.1, "규칙 기반 설명 생성 중…")
+
+    def llm_fn(escalated: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        import llm
+        job.report(0.3, f"LLM 응답 대기 중… ({len(escalated)}/{len(items)}건)")
+        return llm.run_ad(escalated) if ruleset == "ad" else llm.run_report(escalated)
+
+    results, stats = explain.explain_items(ruleset, items, llm_fn=llm_fn)
+    return {"results": results, "stats": stats}
+
+def run_pdf(job: Job, summary: dict, rows: list, outputs: list) -> bytes:
+    from report import export_pdf
+    job.report(0.1, "PDF 리포트를 생성 중…")
+    # 세션마다 다른 임시 파일 (동시 생성 시 덮어쓰기 방지)
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix="veriai_")
+    os.close(fd)
+    try:
+        export_pdf(summary, rows, outputs, path=path, visuals=None)
+        return Path(path).read_bytes()
+    finally:
+        Path(path).unlink(missing_ok=True)
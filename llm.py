@@ -1,6 +1,7 @@
 # llm.py — updated with caching and few-shot prompts
-import os, json, re
-from typing import List, Dict, Any
+import os, json, re, threading, time
+from collections import deque
+from typing import List, Dict, Any, Deque
 from openai import OpenAI
 import streamlit as st
 
@@ -18,8 +19,9 @@ def _get_client() -> OpenAI:
         raise RuntimeError("OPENAI_API_KEY 환경변수가 설정되지 않았습니다. 환경변수를 설정하고 다시 시도하세요.")
     return OpenAI(api_key=key)
 
-def _call_openai(system: str, user: str) -> str:
+def _call_openai(system: str, user: str, *, kind: str = "", n_items: int = 0) -> str:
     client = _get_client()
+    t0 = time.perf_counter()
     resp = client.chat.completions.create(
         model=MODEL,
         temperature=0.1,
@@ -29,7 +31,78 @@ def _call_openai(system: str, user: str) -> str:
             {"role": "user", "content": _u(user)},
         ],
     )
-    return resp.choices[0].message.content
+    content = resp.choices[0].message.content
+    _record_usage(kind, n_items, system, user, content, getattr(resp, "usage", None), time.perf_counter() - t0)
+    return content
+
+# ---- Token accounting ----
+_ENC: Any = None
+TOKENIZER = ""
+
+def _encoder() -> Any:
+    """tiktoken encoder, loaded once; 미설치이거나 인코딩 파일을 받을 수 없으면(오프라인) None."""
+    global _ENC, TOKENIZER
+    if not TOKENIZER:
+        try:
+            import tiktoken
+            try:
+                _ENC = tiktoken.encoding_for_model(MODEL)
+            except KeyError:
+                _ENC = tiktoken.get_encoding("o200k_base")
+            TOKENIZER = "tiktoken"
+        except Exception:
+            _ENC, TOKENIZER = None, "heuristic"
+    return _ENC
+
+def count_tokens(text: str) -> int:
+    """Local token count (tiktoken을 쓸 수 없으면 ASCII 4자/토큰 + 비ASCII 1자/토큰으로 근사)."""
+    text = _u(text)
+    enc = _encoder()
+    if enc is not None:
+        return len(enc.encode(text))
+    ascii_n = sum(1 for ch in text if ord(ch) < 128)
+    return -(-ascii_n // 4) + (len(text) - ascii_n)
+
+def prompt_tokens(system: str, user: str) -> int:
+    # chat 형식 오버헤드: 메시지당 약 4토큰 + 응답 프라이밍 3토큰
+    return count_tokens(system) + count_tokens(user) + 11
+
+USAGE: Deque[Dict[str, Any]] = deque(maxlen=1000)
+_USAGE_LOCK = threading.Lock()
+
+def _record_usage(kind: str, n_items: int, system: str, user: str, completion: str, usage: Any, elapsed: float) -> None:
+    details = getattr(usage, "prompt_tokens_details", None)
+    rec = {
+        "ts": time.time(),
+        "kind": kind,
+        "model": MODEL,
+        "n_items": n_items,
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "cached_tokens": getattr(details, "cached_tokens", None),
+        "prompt_tokens_local": prompt_tokens(system, user),
+        "completion_tokens_local": count_tokens(completion or ""),
+        "latency_ms": round(elapsed * 1000, 1),
+    }
+    with _USAGE_LOCK:
+        USAGE.append(rec)
+
+def usage_summary() -> Dict[str, Any]:
+    """Totals over recorded calls (API가 준 값 우선, 없으면 로컬 계산값)."""
+    with _USAGE_LOCK:
+        recs = list(USAGE)
+    pt = sum(r["prompt_tokens"] if r["prompt_tokens"] is not None else r["prompt_tokens_local"] for r in recs)
+    ct = sum(r["completion_tokens"] if r["completion_tokens"] is not None else r["completion_tokens_local"] for r in recs)
+    items = sum(r["n_items"] for r in recs)
+    return {
+        "calls": len(recs),
+        "items": items,
+        "prompt_tokens": pt,
+        "completion_tokens": ct,
+        "cached_tokens": sum(r["cached_tokens"] or 0 for r in recs),
+        "prompt_tokens_per_item": round(pt / items, 1) if items else None,
+        "tokenizer": TOKENIZER or "unused",
+    }
 
 def _extract_json_array(text: str):
     text = _u(text)
@@ -49,118 +122,61 @@ def _extract_json_array(text: str):
     raise ValueError("모델 응답에서 JSON 배열을 추출하지 못했습니다.")
 
 # ---- Prompts ----
+CACHE_MIN_PREFIX_TOKENS = 1024   # OpenAI 프롬프트 캐싱이 적용되는 최소 프롬프트 길이
+
+# 시스템 메시지 = 호출마다 바이트 단위로 동일한 공유 접두부(역할·태그·출력 스키마·예시 1개).
+# 접두부는 약 430~500토큰으로 캐싱 최소 길이보다 짧아 공급자 측 캐시에는 걸리지 않는다.
+# 최소 길이를 넘기려면 호출마다 ~1000토큰을 더 보내야 하는데, 캐시된 토큰도 TPM 한도에 집계되므로
+# 분당 처리 문장 수가 오히려 줄어든다 → 짧게 유지한다 (scripts/bench_prompt_tokens.py로 확인).
+# 가변 데이터는 넣지 않는다: 접두부가 바이트 단위로 같아야 문장 수와 무관하게 토큰이 고정된다.
+# 사용자 메시지 = 문장별 한 줄 [id, 사전위험도, 등급, 문장] (문장 텍스트를 한 번만 보냄).
 _AD_SYSTEM = _u("""당신은 환경광고/표시의 사실성·그린워싱 위험을 점검하는 분석가다.
 1) 왜 위험한지 분류/설명하고, 2) 입력 텍스트에 실제 존재하는 URL만 existing_citations에 넣고,
 3) 부족한 근거를 채우기 위한 evidence_needed와 검색 쿼리를 제안하라.
 분류 태그: ["모호어","과장표현","미래시제·계획부재","범위과대","근거부족","오프셋의존","기한·지표부재"].
-링크 지어내지 말 것. 한국어로 답하고, 출력은 JSON 배열 하나만.""")
-
-_AD_USER_TMPL = """다음 위험 문장 리스트를 분석해줘.
-[메타]
-- 문서종류: 환경 광고/표시
-- 문장_리스트: {sentences_json}
-- 문장별 사전점수(참고): {scores_json}
-
-[예시]
-- 입력: {{"id": 1, "text": "우리의 혁신적인 기술로 지구를 위한 지속가능한 미래를 만듭니다."}}
-- 출력:
-{{
-  "id": 1,
-  "risk_reasons": ["모호어", "근거부족", "기한·지표부재"],
-  "explanation": "'혁신적인 기술', '지속가능한 미래' 등은 의미가 불분명한 마케팅 용어입니다. 어떤 기술인지, '지속가능성'을 어떤 기준으로 측정하는지 명시해야 합니다.",
-  "existing_citations": [],
-  "evidence_needed": ["기술의 구체적인 원리/명칭", "지속가능성 기여도 정량지표(예: tCO2e 감축량)", "기준연도/목표연도", "외부 기술 검증 보고서"],
-  "suggested_queries": ["(회사명) 지속가능성 보고서", "(기술명) 환경 영향 평가 결과"],
-  "reference_standards": ["ISO 14021", "FTC Green Guides"],
-  "confidence": 0.9
-}}
-
-[요구]
-각 문장마다 위 예시와 같은 JSON 항목으로만 출력:
-{{
-  "id": <원문 id>,
-  "risk_reasons": ["모호어","범위과대",...],
-  "explanation": "<누락된 지표/기간/적용범위/단위 등>",
-  "existing_citations": [],
-  "evidence_needed": ["정량지표(tCO2e, kWh)","기준연도/목표연도","적용범위(조직/제품/공급망)","외부검증/인증"],
-  "suggested_queries": ["<검증용 검색쿼리 #1>","<검증용 검색쿼리 #2>"],
-  "reference_standards": ["GHG Protocol","SBTi","ISO 14064"],
-  "confidence": 0.0
-}}
-출력은 JSON 배열 하나만."""
+링크 지어내지 말 것. 한국어로 답하고, 출력은 JSON 배열 하나만.
+
+[입력] 환경 광고/표시 문장. 줄마다 [id, 사전위험도(0-100, 참고), 등급, 문장]
+[출력] 문장마다 아래 예시와 같은 키의 객체 하나. evidence_needed는 정량지표(tCO2e, kWh)·기준연도/목표연도·적용범위(조직/제품/공급망)·외부검증/인증 중 부족한 것,
+reference_standards는 GHG Protocol, SBTi, ISO 14064, ISO 14021, FTC Green Guides 등, confidence는 0~1.
+입력: [1,82.0,"High","우리의 혁신적인 기술로 지구를 위한 지속가능한 미래를 만듭니다."]
+출력: [{"id":1,"risk_reasons":["모호어","근거부족","기한·지표부재"],"explanation":"'혁신적인 기술', '지속가능한 미래'는 의미가 불분명합니다. 어떤 기술인지, 무엇을 기준으로 측정하는지 명시해야 합니다.","existing_citations":[],"evidence_needed":["정량지표(tCO2e 감축량)","기준연도/목표연도","외부 검증 보고서"],"suggested_queries":["(회사명) 지속가능성 보고서","(기술명) 환경 영향 평가"],"reference_standards":["ISO 14021","FTC Green Guides"],"confidence":0.9}]""")
 
 _REPORT_SYSTEM = _u("""당신은 일반 보고서의 근거성·명확성·재현가능성을 점검하는 에디터다.
 문장의 애매/허세/근거부족 요소를 지적하고, 무엇을(데이터·방법·지표·표/그림·인용) 추가할지 제안하라.
-입력에 존재하는 URL만 existing_citations에 넣고, 없으면 빈 배열. 한국어로, JSON 배열 하나만.""")
-
-_REPORT_USER_TMPL = """다음 위험 문장 리스트를 분석해줘.
-[메타]
-- 문서종류: 일반 보고서
-- 문장_리스트: {sentences_json}
-- 문장별 사전점수(참고): {scores_json}
-
-[예시]
-- 입력: {{"id": 1, "text": "이 시스템은 전반적으로 상당한 성능 개선을 보였습니다."}}
-- 출력:
-{{
-  "id": 1,
-  "issues": ["weasel word", "근거/출처 부재", "통계/표본 정보 부족"],
-  "what_to_add": {{
-    "metrics": ["'성능 개선'의 구체적 지표(예: 응답시간, 처리량)", "개선율(%) 또는 절대수치 변화량", "측정 기간"],
-    "method": ["성능 측정 방법론", "테스트 환경(HW/SW 스펙)", "비교 대상(Baseline) 시스템 정보"],
-    "tables_figures": ["Table: 전후 성능 지표 비교표", "Fig: 시간에 따른 성능 변화 그래프"],
-    "citations": ["내부 성능 테스트 결과 보고서 링크"]
-  }},
-  "existing_citations": [],
-  "suggested_queries": ["시스템 성능 벤치마크 방법론", "(시스템명) 성능 측정 논문"],
-  "confidence": 0.9
-}}
-
-[요구]
-각 문장마다 위 예시와 같은 JSON 항목으로만 출력:
-{{
-  "id": <원문 id>,
-  "issues": ["weasel word","근거/출처 부재","범위/대상 불명확","기간/마일스톤 없음","통계/표본 정보 부족"],
-  "what_to_add": {{
-    "metrics": ["정확한 수치+단위","기준연도/기간","성공기준(KPI)"],
-    "method": ["표본(n)/수집방법","통계검정(p, CI)","재현 가능한 절차(SOP)"],
-    "tables_figures": ["Fig: 프로세스/아키텍처","Table: 지표 정의/결과 요약"],
-    "citations": ["핵심 선행연구/표준","내부 로그/스크린샷","감사/검증보고서"]
-  }},
-  "existing_citations": [],
-  "suggested_queries": ["<근거 보강용 검색쿼리>"],
-  "confidence": 0.0
-}}
-출력은 JSON 배열 하나만."""
+입력에 존재하는 URL만 existing_citations에 넣고, 없으면 빈 배열. 한국어로, JSON 배열 하나만.
+
+[입력] 일반 보고서 문장. 줄마다 [id, 사전위험도(0-100, 참고), 등급, 문장]
+[출력] 문장마다 아래 예시와 같은 키의 객체 하나. issues는 "weasel word","근거/출처 부재","범위/대상 불명확","기간/마일스톤 없음","통계/표본 정보 부족" 등,
+what_to_add는 metrics(수치+단위·기준연도/기간·KPI)/method(표본·통계검정·재현 절차)/tables_figures/citations, confidence는 0~1.
+입력: [1,64.5,"Medium","이 시스템은 전반적으로 상당한 성능 개선을 보였습니다."]
+출력: [{"id":1,"issues":["weasel word","근거/출처 부재","통계/표본 정보 부족"],"what_to_add":{"metrics":["성능 지표(응답시간, 처리량)와 개선율(%)","측정 기간"],"method":["측정 방법론","테스트 환경","비교 대상(Baseline)"],"tables_figures":["Table: 전후 성능 비교표"],"citations":["성능 테스트 결과 보고서"]},"existing_citations":[],"suggested_queries":["시스템 성능 벤치마크 방법론"],"confidence":0.9}]""")
+
+def build_payload(items_list: List[Dict[str, Any]]) -> str:
+    """Per-call user message: 한 줄에 [id, risk, label, text] (공백 없는 JSON, 한글은 이스케이프하지 않음)."""
+    lines = []
+    for it in items_list:
+        risk = it.get("risk")
+        row = [int(it["id"]), round(float(risk), 1) if risk is not None else None, it.get("label"), _u(it["text"])]
+        lines.append(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(lines)
+
+def run_ad(items_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Uncached ad analysis (백그라운드 작업 스레드에서도 호출 가능)."""
+    raw = _call_openai(_AD_SYSTEM, build_payload(items_list), kind="ad", n_items=len(items_list))
+    return _extract_json_array(raw)
+
+def run_report(items_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Uncached report analysis (백그라운드 작업 스레드에서도 호출 가능)."""
+    raw = _call_openai(_REPORT_SYSTEM, build_payload(items_list), kind="report", n_items=len(items_list))
+    return _extract_json_array(raw)
 
 @st.cache_data(show_spinner="LLM이 광고 문장을 분석 중입니다...")
 def analyze_ad(hashable_items: tuple) -> List[Dict[str, Any]]:
-    # --- 추가된 부분 시작 ---
     # 캐시를 위해 변환된 tuple을 다시 list of dicts로 복원
-    items_list = [dict(item) for item in hashable_items]
-    # --- 추가된 부분 끝 ---
-    
-    sentences = [{"id": int(it["id"]), "text": _u(it["text"])} for it in items_list]
-    scores = {int(it["id"]): {"risk": it.get("risk"), "label": it.get("label")} for it in items_list}
-    user = _AD_USER_TMPL.format(
-        sentences_json=json.dumps(sentences, ensure_ascii=False),
-        scores_json=json.dumps(scores, ensure_ascii=False),
-    )
-    raw = _call_openai(_AD_SYSTEM, user)
-    return _extract_json_array(raw)
+    return run_ad([dict(item) for item in hashable_items])
 
 @st.cache_data(show_spinner="LLM이 보고서 문장을 분석 중입니다...")
 def analyze_report(hashable_items: tuple) -> List[Dict[str, Any]]:
-    # --- 추가된 부분 시작 ---
     # 캐시를 위해 변환된 tuple을 다시 list of dicts로 복원
-    items_list = [dict(item) for item in hashable_items]
-    # --- 추가된 부분 끝 ---
-
-    sentences = [{"id": int(it["id"]), "text": _u(it["text"])} for it in items_list]
-    scores = {int(it["id"]): {"risk": it.get("risk"), "label": it.get("label")} for it in items_list}
-    user = _REPORT_USER_TMPL.format(
-        sentences_json=json.dumps(sentences, ensure_ascii=False),
-        scores_json=json.dumps(scores, ensure_ascii=False),
-    )
-    raw = _call_openai(_REPORT_SYSTEM, user)
-    return _extract_json_array(raw)
\ No newline at end of file
+    return run_report([dict(item) for item in hashable_items])
@@ -1,6 +1,114 @@
-from rapidfuzz import fuzz
+# ranker.py — 위험 문장 Top-K 선택 (스트리밍 · 그룹별 · 유사문장 제거 · 워커 간 병합)
+# -----------------------------------------------------------------------------
+# 채점된 레코드를 한 건씩 받아 그룹(브랜드 등)마다 크기 K의 최소 힙만 유지한다.
+#  - 힙이 차 있고 현재 K번째보다 낮은 레코드는 유사도 계산 없이 바로 버림 (대부분의 레코드)
+#  - 후보가 들어오면 보관 중인 K개와만 fuzz.ratio 비교:
+#      더 높은 순위의 유사 문장이 있으면 버리고, 아니면 유사한 하위 문장들을 밀어낸다
+#  - 그룹당 메모리 O(K); TopK 객체는 pickle 가능하므로 프로세스별로 모은 뒤 merge()로 합친다
+# 위험도 내림차순으로 들어오면 기존 일괄 방식(정렬 후 탐욕 선택)과 결과가 같다.
+# 임의 순서에서는 나중에 밀려난 문장이 가리고 있던 문장을 되살리지 않는다(메모리 O(K)를 위한 근사).
+#
+# 사용:
+#   python ranker.py scored.jsonl --k 10 --by brand --workers 4   # ingest.py 출력에서 브랜드별 Top-K
+# -----------------------------------------------------------------------------
+import argparse
+import heapq
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
 import pandas as pd
-from typing import Iterable, Tuple
+from rapidfuzz import fuzz, process
+
+_GLOBAL = "__all__"
+
+class TopK:
+    """Bounded, near-duplicate-free Top-K by risk, per group (by=None → 전체 하나)."""
+
+    def __init__(
+        self,
+        k: int = 5,
+        *,
+        by: Optional[str] = None,                       # ← 그룹 필드 (예: "brand")
+        min_risk: float = 40.0,                         # ← 최소 위험도(기본: Medium 기준)
+        allowed_labels: Optional[Tuple[str, ...]] = ("High", "Medium"),  # ← 포함할 라벨 (None이면 전부)
+        similarity_threshold: int = 85,
+    ):
+        self.k = k
+        self.by = by
+        self.min_risk = min_risk
+        self.allowed_labels = tuple(allowed_labels) if allowed_labels is not None else None
+        self.similarity_threshold = similarity_threshold
+        # 그룹 → 최소 힙 [(risk, -seq, sentence, rec)]; (risk, -seq)가 클수록 높은 순위
+        # (같은 위험도면 먼저 들어온 레코드가 위 — 안정 정렬과 같은 순서)
+        self.heaps: Dict[Hashable, List[Tuple[float, int, str, Mapping[str, Any]]]] = {}
+        self.seen = 0
+        self._seq = itertools.count()
+
+    def _group(self, rec: Mapping[str, Any]) -> Hashable:
+        return _GLOBAL if self.by is None else rec.get(self.by)
+
+    def push(self, rec: Mapping[str, Any]) -> bool:
+        """Offer one scored record ({"sentence", "risk", "label", ...}); True if retained."""
+        self.seen += 1
+        risk = float(rec["risk"])
+        if risk < self.min_risk:
+            return False
+        if self.allowed_labels is not None and "label" in rec and rec["label"] not in self.allowed_labels:
+            return False
+        return self._offer(self._group(rec), (risk, -next(self._seq), str(rec["sentence"]), rec))
+
+    def _offer(self, group: Hashable, item: Tuple[float, int, str, Mapping[str, Any]]) -> bool:
+        heap = self.heaps.setdefault(group, [])
+        rank = item[:2]
+        if len(heap) >= self.k and rank <= heap[0][:2]:
+            return False                                    # K번째보다 낮음 → 비교 없이 버림
+        similar = process.extract(item[2], [h[2] for h in heap], scorer=fuzz.ratio,
+                                  score_cutoff=self.similarity_threshold, limit=None)
+        if similar:
+            if any(heap[j][:2] >= rank for _, _, j in similar):
+                return False                                # 더 높은(또는 같은) 순위의 유사 문장이 있음
+            drop = {j for _, _, j in similar}
+            heap[:] = [h for j, h in enumerate(heap) if j not in drop]
+            heapq.heapify(heap)
+        heapq.heappush(heap, item)
+        if len(heap) > self.k:
+            heapq.heappop(heap)
+        return True
+
+    def update(self, records: Iterable[Mapping[str, Any]]) -> "TopK":
+        for rec in records:
+            self.push(rec)
+        return self
+
+    def merge(self, *others: "TopK") -> "TopK":
+        """Fold other selectors (다른 워커의 부분 결과) into this one."""
+        incoming: Dict[Hashable, list] = {}
+        for other in others:
+            self.seen += other.seen
+            for group, heap in other.heaps.items():
+                incoming.setdefault(group, []).extend(heap)
+        # 부분 결과를 합쳐 위험도 내림차순으로 다시 흘려 넣는다 (각 워커 안의 순서는 유지)
+        for group, items in incoming.items():
+            for risk, _, sentence, rec in sorted(items, key=lambda h: h[:2], reverse=True):
+                self._offer(group, (risk, -next(self._seq), sentence, rec))
+        return self
+
+    def groups(self) -> List[Hashable]:
+        return [g for g, h in self.heaps.items() if h]
+
+    def result(self, group: Hashable = _GLOBAL) -> List[Mapping[str, Any]]:
+        """Retained records of a group, risk descending (by=None이면 인자 없이 호출)."""
+        return [h[3] for h in sorted(self.heaps.get(group, ()), reverse=True)]
+
+    def results(self) -> Dict[Hashable, List[Mapping[str, Any]]]:
+        return {g: self.result(g) for g in self.groups()}
+
+    def __len__(self) -> int:
+        return sum(len(h) for h in self.heaps.values())
 
 def select_top_k(
     df: pd.DataFrame,
@@ -11,7 +119,7 @@ def select_top_k(
     similarity_threshold: int = 85
 ) -> pd.DataFrame:
     # 1) 필터
-    work = df.copy()
+    work = df
     if "label" in work.columns:
         work = work[work["label"].isin(allowed_labels)]
     work = work[work["risk"] >= min_risk]
@@ -19,14 +127,75 @@ def select_top_k(
     if work.empty:
         return work  # 비어있으면 그대로 반환(앱에서 안내)
 
-    # 2) 위험도 내림차순 + 유사문장 제거
-    work = work.sort_values("risk", ascending=False).reset_index(drop=True)
-    selected = []
-    for _, row in work.iterrows():
-        s = row["sentence"]
-        if all(fuzz.ratio(s, prev) < similarity_threshold for prev in selected):
-            selected.append(s)
-            if len(selected) >= k:
+    # 2) 위험도 내림차순으로 TopK에 흘려 넣기 (정렬된 입력 → 기존 탐욕 선택과 동일한 결과;
+    #    K개가 찬 뒤의 레코드는 유사도 비교 없이 버려진다)
+    sel = TopK(k, min_risk=min_risk, allowed_labels=None, similarity_threshold=similarity_threshold)
+    order = np.argsort(-work["risk"].to_numpy(dtype=float), kind="stable")
+    sents, risks = work["sentence"].to_numpy(), work["risk"].to_numpy()
+    for i in order:
+        sel.push({"row": i, "sentence": sents[i], "risk": risks[i]})
+    return work.iloc[[r["row"] for r in sel.result()]]
+
+# ====== Batch over ingest.py output ===============================================
+def _records(path: str, start: int = 0, end: Optional[int] = None) -> Iterable[Dict[str, Any]]:
+    """Sentence records in byte range [start, end) of an ingest.py JSONL file (줄 단위 정렬)."""
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()                # 앞 구간에 걸친 줄은 앞 워커 몫
+        while end is None or f.tell() < end:
+            line = f.readline()
+            if not line:
                 break
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(rec, dict) or "error" in rec:
+                continue
+            if "sentences" in rec:
+                meta = {k: rec[k] for k in ("id", "brand", "ruleset") if k in rec}
+                for r in rec["sentences"]:
+                    yield {**meta, **r}
+            elif "sentence" in rec:
+                yield rec
+
+def _select_range(path: str, start: int, end: int, k: int, opts: Dict[str, Any]) -> TopK:
+    return TopK(k, **opts).update(_records(path, start, end))
+
+def top_k_jsonl(paths: Iterable[str], k: int = 10, *, workers: int = 1, **opts: Any) -> TopK:
+    """Top-K over JSONL files; 파일을 바이트 구간으로 나눠 워커별로 고른 뒤 병합."""
+    ranges = []
+    for path in paths:
+        size = os.path.getsize(path)
+        step = max(1, -(-size // max(1, workers)))
+        ranges += [(path, a, min(a + step, size)) for a in range(0, size, step)]
+    if workers <= 1 or len(ranges) <= 1:
+        return TopK(k, **opts).merge(*(_select_range(p, a, b, k, opts) for p, a, b in ranges))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_select_range, *zip(*ranges), itertools.repeat(k), itertools.repeat(opts)))
+    return TopK(k, **opts).merge(*parts)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Streaming Top-K risky sentences from ingest.py JSONL output")
+    ap.add_argument("jsonl", nargs="+")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--by", default=None, help="그룹 필드 (예: brand); 생략하면 전체")
+    ap.add_argument("--min-risk", type=float, default=40.0)
+    ap.add_argument("--labels", default="High,Medium", help="쉼표 구분; 빈 문자열이면 전부")
+    ap.add_argument("--similarity", type=int, default=85)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args(argv)
+
+    labels = tuple(x for x in args.labels.split(",") if x) or None
+    sel = top_k_jsonl(args.jsonl, args.k, workers=args.workers, by=args.by, min_risk=args.min_risk,
+                      allowed_labels=labels, similarity_threshold=args.similarity)
+    print(f"{sel.seen} sentences → {len(sel)} kept in {len(sel.groups())} group(s)")
+    for group, recs in sel.results().items():
+        if args.by:
+            print(f"[{group}]")
+        for r in recs:
+            print(f"  {float(r['risk']):5.1f}  {r.get('label', ''):<6} {str(r['sentence'])[:100]}")
 
-    return work[work["sentence"].isin(selected)].sort_values("risk", ascending=False)
+if __name__ == "__main__":
+    main()
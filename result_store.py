@@ -0,0 +1,148 @@
+# result_store.py — 프로세스 공용 분석 결과 저장소 (세션은 키만 보관)
+# -----------------------------------------------------------------------------
+# 같은 문서를 여러 세션이 분석해도 결과 DataFrame/검색 색인은 한 벌만 메모리에 둔다.
+#  - 키: (텍스트 해시, 규칙 설정 해시) → 같은 입력·같은 규칙이면 어느 세션이든 같은 결과
+#  - 세션은 get(key, holder)로 참조를 잡고(release로 해제), view()로 얕은 읽기 전용 뷰를 받는다
+#    (Copy-on-Write: 뷰를 수정해도 공유 데이터는 바뀌지 않고 그때만 복사됨 — pandas 3은 기본값,
+#     그 이전 버전은 앱 시작 시 app.py가 mode.copy_on_write를 켠다; 이 모듈은 전역 설정을 건드리지 않음)
+#  - 총 크기가 상한(VERIAI_RESULT_CACHE_MB, 기본 512MB)을 넘으면 LRU로 정리
+#    (참조 없는 항목 우선; 오래 응답 없는 세션의 참조는 LEASE 후 만료)
+# -----------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+import rules
+
+CAP_BYTES = int(float(os.getenv("VERIAI_RESULT_CACHE_MB", "512")) * 1024 * 1024)
+LEASE_SECONDS = float(os.getenv("VERIAI_RESULT_LEASE_SECONDS", "1800"))
+
+ResultKey = Tuple[str, str]
+
+def result_key(text: str, ruleset: str) -> ResultKey:
+    """(text hash, ruleset config hash) — 가중치/임계값까지 포함해 규칙이 바뀌면 키도 바뀐다."""
+    return (hashlib.sha1(text.encode("utf-8")).hexdigest()[:16], rules.get_engine(ruleset).config_fingerprint)
+
+def _nbytes(df: pd.DataFrame, index: Any) -> int:
+    n = int(df.memory_usage(deep=True).sum())
+    if index is not None and hasattr(index, "nbytes"):
+        n += index.nbytes()
+    return n
+
+class Entry:
+    def __init__(self, key: ResultKey, df: pd.DataFrame, index: Any, meta: Dict[str, Any]):
+        self.key = key
+        self._df = df
+        self.index = index
+        self.meta = meta
+        self.nbytes = _nbytes(df, index)
+        self.holders: Dict[str, float] = {}   # holder id → 마지막 접근 시각
+        self.created = self.last_access = time.time()
+
+    def view(self) -> pd.DataFrame:
+        """Shallow view (데이터 복사 없음; Copy-on-Write가 켜져 있으면 수정 시 뷰만 복사됨)."""
+        return self._df.copy(deep=False)
+
+    @property
+    def refs(self) -> int:
+        return len(self.holders)
+
+class ResultStore:
+    def __init__(self, cap_bytes: int = CAP_BYTES, lease_seconds: float = LEASE_SECONDS):
+        self.cap = cap_bytes
+        self.lease = lease_seconds
+        self.entries: "OrderedDict[ResultKey, Entry]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def put(self, key: ResultKey, df: pd.DataFrame, index: Any = None, **meta: Any) -> Entry:
+        """Store a result (이미 있으면 기존 항목 유지) and evict down to the cap."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = Entry(key, df, index, meta)
+            self.entries.move_to_end(key)
+            self._evict(keep=key)
+            return entry
+
+    def __contains__(self, key: Optional[ResultKey]) -> bool:
+        """Presence check without touching LRU order or hit/miss stats."""
+        with self.lock:
+            return key is not None and tuple(key) in self.entries
+
+    def get(self, key: Optional[ResultKey], holder: Optional[str] = None) -> Optional[Entry]:
+        """Entry for key (LRU 갱신); holder를 주면 참조를 잡거나 연장한다."""
+        if key is None:
+            return None
+        key = tuple(key)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            entry.last_access = now
+            if holder is not None:
+                entry.holders[holder] = now
+            self.entries.move_to_end(key)
+            return entry
+
+    def release(self, key: Optional[ResultKey], holder: str) -> None:
+        if key is None:
+            return
+        with self.lock:
+            entry = self.entries.get(tuple(key))
+            if entry is not None:
+                entry.holders.pop(holder, None)
+                self._evict()
+
+    def _evict(self, keep: Optional[ResultKey] = None) -> None:
+        now = time.time()
+        for e in self.entries.values():
+            for h in [h for h, t in e.holders.items() if now - t > self.lease]:
+                del e.holders[h]
+        total = sum(e.nbytes for e in self.entries.values())
+        # 1) 참조 없는 항목부터, 2) 그래도 넘치면 참조 중인 항목도 (세션은 재분석 안내를 받음)
+        for referenced in (False, True):
+            for k in list(self.entries):
+                if total <= self.cap:
+                    return
+                e = self.entries[k]
+                if k == keep or (e.refs > 0) != referenced:
+                    continue
+                del self.entries[k]
+                total -= e.nbytes
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            total = sum(e.nbytes for e in self.entries.values())
+            return {
+                "entries": len(self.entries),
+                "bytes": total,
+                "cap_bytes": self.cap,
+                "refs": sum(e.refs for e in self.entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                # 세션마다 복사했다면 필요했을 메모리 (참조 수 × 크기)
+                "bytes_if_copied": sum(e.nbytes * max(1, e.refs) for e in self.entries.values()),
+            }
+
+_STORE: Optional[ResultStore] = None
+_STORE_LOCK = threading.Lock()
+
+def get_store() -> ResultStore:
+    """Process-wide store (Streamlit 세션/재실행과 무관하게 하나)."""
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ResultStore()
+        return _STORE
@@ -2,8 +2,10 @@
 # -----------------------------------------------------------------------------
 import re
 import json
+import hashlib
+import numpy as np
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 # ====== Config loader (ad/report) =================================================
 ROOT = Path(__file__).parent
@@ -29,28 +31,37 @@ TH: Dict[str, float] = {}
 RX: Dict[str, re.Pattern] = {}
 LEX: Dict[str, List[str]] = {}
 CURRENT_RULESET: Optional[str] = None
+_ENGINE: Optional["RuleEngine"] = None
+_ENGINES: Dict[str, "RuleEngine"] = {}
 
-def load_rules(ruleset: str = "ad") -> None:
-    """Load selected ruleset (ad/report) and compile globals."""
-    global CFG, W, TH, RX, LEX, CURRENT_RULESET
+def get_engine(ruleset: str = "ad") -> "RuleEngine":
+    """Return the compiled engine for a ruleset (JSON 로딩/정규식 컴파일은 프로세스당 1회)."""
     ruleset = ruleset if ruleset in ("ad","report") else "ad"
-    path = _resolve_rule_file(ruleset)
-    CFG = json.loads(path.read_text(encoding="utf-8"))
-    W = CFG.get("weights", {})
-    TH = CFG.get("thresholds", {"high": 70, "medium": 40})
-    RX = {k: re.compile(v) for k, v in CFG.get("regex", {}).items()}
-    LEX = CFG.get("lexicons", {})
-    CURRENT_RULESET = ruleset
+    eng = _ENGINES.get(ruleset)
+    if eng is None:
+        path = _resolve_rule_file(ruleset)
+        eng = RuleEngine(ruleset, json.loads(path.read_text(encoding="utf-8")))
+        _ENGINES[ruleset] = eng
+    return eng
 
-# initial load
-load_rules("ad")
+def load_rules(ruleset: str = "ad") -> None:
+    """Load selected ruleset (ad/report) and compile globals."""
+    global CFG, W, TH, RX, LEX, CURRENT_RULESET, _ENGINE
+    _ENGINE = get_engine(ruleset)
+    CFG = _ENGINE.cfg
+    W = _ENGINE.W
+    TH = _ENGINE.TH
+    RX = _ENGINE.RX
+    LEX = _ENGINE.LEX
+    CURRENT_RULESET = _ENGINE.name
 
 # ====== Safe getters ==============================================================
 def L(name: str) -> List[str]:
     return LEX.get(name, [])
 
 def RXget(name: str, default: str = r"$") -> re.Pattern:
-    return RX.get(name, re.compile(default))
+    rx = RX.get(name)
+    return rx if rx is not None else re.compile(default)
 
 def _count_contains(s: str, words: List[str]) -> int:
     """Counts whole-word occurrences of words from a list in a string."""
@@ -117,155 +128,519 @@ def split_sentences(text: str) -> List[str]:
     return _final_split(t)
 
 # ====== Feature extraction & scoring =============================================
-def extract_features(sentence: str) -> Dict[str, Any]:
-    s = sentence.strip()
-
-    # regex-based indicators
-    has_number_unit = bool(RXget("number_unit").search(s))
-    has_year = bool(RXget("year").search(s))
-    has_scope = bool(RXget("scope").search(s))
-    has_url = bool(RXget("url").search(s))
-    has_award_rating = bool(RXget("award_or_rating").search(s))
-    has_money = bool(RXget("money").search(s))
-    has_time_phrase = bool(RXget("time_phrase").search(s))
-    has_percent_change = bool(RXget("percent_change").search(s))
+# risk 계산에 쓰이는 구성요소: (가중치 키, 특징 키, 정규화 분모)
+COMPONENTS = [
+    ("evidence_inverse", "evidence_score", 16),
+    ("vagueness", "vagueness_score", 16),
+    ("language", "language_risk", 8),
+    ("coverage", "coverage_penalty", 6),
+    ("temporal", "temporal_penalty", 4),
+    ("offset_risk", "offset_flag", 1),
+]
+_DEFAULT_W = {"evidence_inverse": 0.30, "vagueness": 0.22, "language": 0.12, "coverage": 0.10, "temporal": 0.16, "offset_risk": 0.10}
+
+def component_matrix(features: List[Dict[str, Any]]) -> np.ndarray:
+    """(n, 6) matrix of normalized risk components, ordered like COMPONENTS."""
+    m = np.array(
+        [[float(f.get(key, 0)) / den for _, key, den in COMPONENTS] for f in features],
+        dtype=np.float64,
+    ).reshape(len(features), len(COMPONENTS))
+    m[:, 0] = 1 - m[:, 0]  # evidence는 역방향
+    return m
+
+# 상세 보기용 히트 그룹 → 원본 렉시콘 (standards_method는 두 렉시콘을 이어붙임)
+HIT_GROUPS = {
+    "vague": ["vague"],
+    "overclaim": ["overclaim"],
+    "future": ["future"],
+    "coverage_risky": ["coverage_risky"],
+    "coverage_clarifier": ["coverage_clarifier"],
+    "standards_method": ["standards", "methodology"],
+    "third_party": ["third_party"],
+    "offset_terms": ["offset_terms"],
+}
+HIT_LEXICONS = [lex for lexs in HIT_GROUPS.values() for lex in lexs]
+
+def hits_from_spans(spans: List[Tuple[int, int, str, str]], *, limit: int = 50) -> Dict[str, List[str]]:
+    """Rebuild the hits dict (same shape/order as _find_hits) from find_spans output."""
+    by_lex: Dict[str, set] = {}
+    for _, _, lexicon, term in spans:
+        by_lex.setdefault(lexicon, set()).add(term)
+    out: Dict[str, List[str]] = {}
+    for group, lexs in HIT_GROUPS.items():
+        out[group] = []
+        for lex in lexs:
+            # 길이 긴 단어 우선(겹침 방지)
+            out[group] += sorted(by_lex.get(lex, ()), key=lambda x: (-len(x), x))[:limit]
+    return out
 
+# 정규식 지표: (특징 키, regex 이름)
+INDICATORS = [
+    ("has_number_unit", "number_unit"),
+    ("has_year", "year"),
+    ("has_scope", "scope"),
+    ("has_url", "url"),
+    ("has_award_or_rating", "award_or_rating"),
+    ("has_money", "money"),
+    ("has_time_phrase", "time_phrase"),
+    ("has_percent_change", "percent_change"),
     # report-specific
-    has_citation_sq = bool(RXget("citation_square").search(s))
-    has_citation_yr = bool(RXget("citation_year").search(s))
-    has_doi = bool(RXget("doi").search(s))
-    has_fig_table = bool(RXget("fig_table").search(s))
-    has_stats = bool(RXget("stats").search(s))
-
-    # lexicon counts
-    c_vague = _count_contains(s, L("vague"))
-    c_overclaim = _count_contains(s, L("overclaim"))
-    c_future = _count_contains(s, L("future"))
-    c_cov_risky = _count_contains(s, L("coverage_risky"))
-    c_cov_clarify = _count_contains(s, L("coverage_clarifier"))
-    c_standards = _count_contains(s, L("standards")) + _count_contains(s, L("methodology"))
-    c_thirdparty = _count_contains(s, L("third_party"))
-    c_offset_terms = _count_contains(s, L("offset_terms"))
-    c_greenhot = _count_contains(s, L("labels_greenwashing_hot"))
-
-    in_category = any(
-        _count_contains(s, L(name)) > 0
-        for name in ["emissions", "energy", "packaging", "waste", "water", "biodiversity", "chemicals", "transport"]
-    )
+    ("has_citation_square", "citation_square"),
+    ("has_citation_year", "citation_year"),
+    ("has_doi", "doi"),
+    ("has_fig_table", "fig_table"),
+    ("has_stats", "stats"),
+]
 
-    # Evidence score
-    evidence = 0
-    evidence += 3 if has_number_unit else 0
-    evidence += 3 if has_year else 0
-    evidence += 3 if c_standards > 0 else 0
-    evidence += 4 if c_thirdparty > 0 else 0
-    evidence += 2 if has_url else 0
-    evidence += 1 if has_award_rating else 0
-    evidence += 1 if has_money else 0
-    evidence += 1 if in_category else 0
-    if CURRENT_RULESET == "report":
-        evidence += 2 if (has_citation_sq or has_citation_yr) else 0
-        evidence += 2 if has_doi else 0
-        evidence += 1 if has_fig_table else 0
-        evidence += 2 if has_stats else 0
-    evidence = min(16, evidence)
-
-    # Vagueness
-    vagueness = 0
-    vagueness += min(8, c_vague)
-    vagueness += 2 if c_overclaim > 0 else 0
-    vagueness += 2 if c_future > 0 else 0
-    vagueness += 1 if c_greenhot > 0 else 0
-    if CURRENT_RULESET == "report" and LEX.get("weasel"):
-        if any(w in s for w in L("weasel")):
-            vagueness = min(16, vagueness + 1)
-
-    # Coverage
-    coverage_penalty = 2 if c_cov_risky > 0 else 0
-    if coverage_penalty and c_cov_clarify > 0:
-        coverage_penalty = max(0, coverage_penalty - 1)
-
-    # Temporal
-    temporal_penalty = 0
-    if c_future > 0 and not has_year:
-        temporal_penalty += 2
-    if c_future > 0 and not (has_time_phrase or has_percent_change):
-        temporal_penalty += 1
-    if has_time_phrase or has_percent_change:
-        temporal_penalty = max(0, temporal_penalty - 1)
-    temporal_penalty = min(4, temporal_penalty)
-
-    # Language
-    language_risk = min(8, (4 if c_overclaim > 0 else 0) + min(4, c_vague))
-
-    # Offset
-    offset_flag = 1 if (c_offset_terms > 0 and not (has_year or has_number_unit or has_scope)) else 0
-
-    hits = {
-        "vague": _find_hits(s, L("vague")),
-        "overclaim": _find_hits(s, L("overclaim")),
-        "future": _find_hits(s, L("future")),
-        "coverage_risky": _find_hits(s, L("coverage_risky")),
-        "coverage_clarifier": _find_hits(s, L("coverage_clarifier")),
-        "standards_method": _find_hits(s, L("standards")) + _find_hits(s, L("methodology")),
-        "third_party": _find_hits(s, L("third_party")),
-        "offset_terms": _find_hits(s, L("offset_terms")),
-    }
-
-    return {
-        "has_number_unit": has_number_unit,
-        "has_year": has_year,
-        "has_scope": has_scope,
-        "has_url": has_url,
-        "has_award_or_rating": has_award_rating,
-        "has_money": has_money,
-        "has_time_phrase": has_time_phrase,
-        "has_percent_change": has_percent_change,
-        "has_citation_square": has_citation_sq,
-        "has_citation_year": has_citation_yr,
-        "has_doi": has_doi,
-        "has_fig_table": has_fig_table,
-        "has_stats": has_stats,
-        "count_vague": c_vague,
-        "count_overclaim": c_overclaim,
-        "count_future": c_future,
-        "count_coverage_risky": c_cov_risky,
-        "count_coverage_clarifier": c_cov_clarify,
-        "count_standards_method": c_standards,
-        "count_third_party": c_thirdparty,
-        "count_greenhot": c_greenhot,
-        "offset_flag": offset_flag,
-        "evidence_score": evidence,
-        "vagueness_score": vagueness,
-        "coverage_penalty": coverage_penalty,
-        "temporal_penalty": temporal_penalty,
-        "language_risk": language_risk,
-        "hits": hits,
-    }
-
-def score_sentence(sentence: str) -> Dict[str, Any]:
-    f = extract_features(sentence)
-    risk = 100 * (
-        W.get("evidence_inverse", 0.30) * (1 - f.get("evidence_score", 0) / 16)
-        + W.get("vagueness", 0.22) * (f.get("vagueness_score", 0) / 16)
-        + W.get("language", 0.12) * (f.get("language_risk", 0) / 8)
-        + W.get("coverage", 0.10) * (f.get("coverage_penalty", 0) / 6)
-        + W.get("temporal", 0.16) * (f.get("temporal_penalty", 0) / 4)
-        + W.get("offset_risk", 0.10) * f.get("offset_flag", 0)
-    )
-    risk = max(0, min(100, round(risk, 1)))
-    label = "High" if risk >= TH.get("high", 70) else ("Medium" if risk >= TH.get("medium", 40) else "Low")
-    f["risk"] = risk
-    f["label"] = label
-    return f
+# ====== Regex prefilter ===========================================================
+# 정규식마다 "매치가 시작될 수 있는 첫 글자" 집합을 파싱 트리에서 구해 문자 클래스로 만든다.
+# 예) year r"\b(19|20)\d{2}\b", money r"(\d{3,})…" → [\d], scope r"(?i)Scope…" → (?i)[S]
+# 문장에 그 클래스가 없으면 해당 정규식은 매치될 수 없으므로 search를 건너뛴다. 같은 클래스를
+# 쓰는 정규식(숫자로 시작하는 패턴 등)은 클래스 검사를 문장당 한 번만 공유한다.
+# re 자체가 첫 글자 건너뛰기를 못 하는 패턴(\b·\d+로 시작, (?i))에만 적용한다.
+try:
+    from re import _parser as _sre_parse, _constants as _sre_c
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+    import sre_constants as _sre_c
+
+_ZERO_WIDTH = {_sre_c.AT, _sre_c.ASSERT, _sre_c.ASSERT_NOT}
+_REPEATS = {_sre_c.MAX_REPEAT, _sre_c.MIN_REPEAT} | ({_sre_c.POSSESSIVE_REPEAT} if hasattr(_sre_c, "POSSESSIVE_REPEAT") else set())
+
+def _first_chars(items, flags: int, icase: List[bool]) -> Optional[Tuple[set, bool]]:
+    """(first-char class parts, nullable) of a parsed sequence; None if unbounded (., [^…], \w …)."""
+    parts: set = set()
+    for op, av in items:
+        if op in _ZERO_WIDTH:
+            continue                                   # \b, ^, 전후방 탐색은 글자를 소비하지 않음
+        if op is _sre_c.LITERAL:
+            sub, nullable = {re.escape(chr(av))}, False
+            icase[0] |= bool(flags & re.IGNORECASE)
+        elif op is _sre_c.IN:
+            sub, nullable = set(), False
+            for iop, iav in av:
+                if iop is _sre_c.LITERAL:
+                    sub.add(re.escape(chr(iav)))
+                elif iop is _sre_c.RANGE:
+                    sub.add(f"{re.escape(chr(iav[0]))}-{re.escape(chr(iav[1]))}")
+                elif iop is _sre_c.CATEGORY and iav is _sre_c.CATEGORY_DIGIT:
+                    sub.add(r"\d")
+                else:
+                    return None
+            icase[0] |= bool(flags & re.IGNORECASE)
+        elif op is _sre_c.BRANCH:
+            sub, nullable = set(), False
+            for branch in av[1]:
+                r = _first_chars(branch, flags, icase)
+                if r is None:
+                    return None
+                sub |= r[0]
+                nullable |= r[1]
+        elif op is _sre_c.SUBPATTERN:
+            _, add_flags, del_flags, p = av
+            r = _first_chars(p, (flags | add_flags) & ~del_flags, icase)
+            if r is None:
+                return None
+            sub, nullable = r
+        elif op in _REPEATS:
+            r = _first_chars(av[2], flags, icase)
+            if r is None:
+                return None
+            sub, nullable = r[0], r[1] or av[0] == 0
+        else:
+            return None                                # ., [^…], 역참조 등
+        parts |= sub
+        if not nullable:
+            return parts, False
+    return parts, True
+
+_DIGITS = {r"\d", *"0123456789"}
+
+def _has_native_prefix(items, flags: int) -> bool:
+    """re가 이미 첫 글자로 건너뛰기를 하는 패턴인지 (대소문자 구분 + 리터럴/클래스/리터럴 분기로 시작)."""
+    while items and items[0][0] is _sre_c.SUBPATTERN:
+        _, add_flags, del_flags, p = items[0][1]
+        flags = (flags | add_flags) & ~del_flags
+        items = list(p)
+    if not items or flags & re.IGNORECASE:
+        return False
+    op, av = items[0]
+    if op is _sre_c.BRANCH:
+        return all(b and b[0][0] is _sre_c.LITERAL for b in av[1])
+    return op in (_sre_c.LITERAL, _sre_c.IN)
+
+def _prefilter_class(rx: re.Pattern) -> Optional[str]:
+    """Character class every match of rx must start with (None → 거르지 않고 바로 search)."""
+    try:
+        parsed = _sre_parse.parse(rx.pattern, rx.flags)
+    except Exception:
+        return None
+    items = list(parsed)
+    if _has_native_prefix(items, parsed.state.flags):
+        return None                                    # 따로 거르면 검사만 한 번 더 하는 셈
+    icase = [False]
+    r = _first_chars(items, parsed.state.flags, icase)
+    if r is None or r[1] or not r[0]:
+        return None                                    # 빈 문자열에 매치 가능 → 거를 수 없음
+    if r[0] <= _DIGITS:
+        return r"[\d]"                                # 숫자로 시작하는 패턴들은 한 검사를 공유
+    return ("(?i)" if icase[0] else "") + "[" + "".join(sorted(r[0])) + "]"
+
+def _trie_pattern(words: List[str]) -> str:
+    """Alternation of words shaped as a prefix trie (같은 접두부는 한 번만 비교; 긴 단어 우선)."""
+    trie: Dict[str, Any] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+class _Scanner:
+    """Evaluates the union of regexes and lexicon words of one or more engines in one pass.
+
+    같은 패턴 문자열/같은 단어는 엔진이 여러 개여도 문장당 한 번만 검사한다.
+    렉시콘은 모든 엔진의 단어를 합친 트라이 정규식 하나로 훑고, 찾은 단어를 (엔진, 렉시콘)으로 되돌린다.
+    """
+
+    def __init__(self, engines: List["RuleEngine"]):
+        self.patterns: List[re.Pattern] = []
+        by_pattern: Dict[str, int] = {}
+        self.gates: List[re.Pattern] = []              # 공유 첫 글자 클래스
+        self.gate_of: List[int] = []                   # 패턴 → gate 번호 (-1: 항상 search)
+        by_gate: Dict[str, int] = {}
+        self.ind_maps: List[List[Tuple[str, int]]] = []
+        for eng in engines:
+            m = []
+            for key, name in INDICATORS:
+                rx = eng.RX.get(name)
+                if rx is None:
+                    m.append((key, -1))
+                    continue
+                if rx.pattern not in by_pattern:
+                    by_pattern[rx.pattern] = len(self.patterns)
+                    self.patterns.append(rx)
+                    cls = _prefilter_class(rx)
+                    if cls is not None and cls not in by_gate:
+                        by_gate[cls] = len(self.gates)
+                        self.gates.append(re.compile(cls))
+                    self.gate_of.append(by_gate[cls] if cls is not None else -1)
+                m.append((key, by_pattern[rx.pattern]))
+            self.ind_maps.append(m)
+        # 단어 → [(엔진 번호, 렉시콘)] (리스트 내 중복도 그대로 카운트)
+        refs: Dict[str, List[Tuple[int, str]]] = {}
+        for i, eng in enumerate(engines):
+            for lexicon, words in eng.LEX.items():
+                for w in words:
+                    if w:
+                        refs.setdefault(w, []).append((i, lexicon))
+        self.refs = refs
+        # 모든 위치에서(전방탐색) 경계 조건을 만족하는 가장 긴 단어를 찾는다 — 겹치는 단어
+        # ("친환경 인증" / "인증")도 놓치지 않도록. 같은 위치에서 함께 맞을 수 있는 더 짧은 단어는
+        # 찾은 단어의 접두어뿐이므로 그것만 따로 확인한다.
+        self.lex_rx = re.compile(r'(?=(\b(?:' + _trie_pattern(list(refs)) + r')\b))') if refs else None
+        self.prefix_words = {
+            w: [(v, re.compile(r'\b' + re.escape(v) + r'\b')) for v in refs if v != w and w.startswith(v)]
+            for w in refs
+        }
+
+    def search_all(self, s: str) -> List[bool]:
+        """Whether each distinct pattern matches s (첫 글자 클래스가 없으면 search 생략)."""
+        open_gates = [g.search(s) is not None for g in self.gates]
+        return [(j < 0 or open_gates[j]) and rx.search(s) is not None
+                for rx, j in zip(self.patterns, self.gate_of)]
+
+    def lex_words(self, s: str) -> set:
+        """Distinct lexicon words with a whole-word (\\b…\\b) occurrence in s."""
+        found: set = set()
+        if self.lex_rx is None:
+            return found
+        for m in self.lex_rx.finditer(s):
+            w = m.group(1)
+            found.add(w)
+            for v, rx in self.prefix_words[w]:
+                if v not in found and rx.match(s, m.start()):
+                    found.add(v)
+        return found
+
+    def scan(self, s: str) -> List[Tuple[Dict[str, bool], Dict[str, int]]]:
+        """Per engine: (indicator booleans, lexicon counts) for one stripped sentence."""
+        found = self.search_all(s)
+        counts: List[Dict[str, int]] = [{} for _ in self.ind_maps]
+        for w in self.lex_words(s):
+            for i, lexicon in self.refs[w]:
+                counts[i][lexicon] = counts[i].get(lexicon, 0) + 1
+        # 누락된 패턴은 기존 RXget 기본값(r"$")과 같이 항상 매치로 취급
+        return [({key: (found[j] if j >= 0 else True) for key, j in m}, counts[i]) for i, m in enumerate(self.ind_maps)]
+
+class RuleEngine:
+    """A compiled ruleset. 전역 상태 없이 ad/report 규칙을 동시에 사용할 수 있다."""
+
+    def __init__(self, name: str, cfg: dict):
+        self.name = name
+        self.cfg = cfg
+        self.W: Dict[str, float] = cfg.get("weights", {})
+        self.TH: Dict[str, float] = cfg.get("thresholds", {"high": 70, "medium": 40})
+        self.RX: Dict[str, re.Pattern] = {k: re.compile(v) for k, v in cfg.get("regex", {}).items()}
+        self.LEX: Dict[str, List[str]] = cfg.get("lexicons", {})
+        self._rx_default = re.compile(r"$")
+        # 렉시콘 단어별 단어경계 패턴을 미리 컴파일 (리스트 순서/중복 유지)
+        self._lex_rx: Dict[str, List[Tuple[str, re.Pattern]]] = {
+            name: [(w, re.compile(r'\b' + re.escape(w) + r'\b')) for w in words if w]
+            for name, words in self.LEX.items()
+        }
+        self.weight_vector = np.array([self.W.get(k, _DEFAULT_W[k]) for k, _, _ in COMPONENTS])
+        self._scanner = _Scanner([self])
+        # 규칙 설정 전체(가중치·임계값 포함)의 지문 — 결과 저장소 키, 버전 비교의 승계 조건으로 사용
+        self.config_fingerprint = hashlib.sha1(
+            json.dumps([name, cfg], ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        # 특징 추출에 영향을 주는 부분(regex/lexicons)만의 지문 — 특징 캐시 키로 사용
+        self.feature_fingerprint = hashlib.sha1(
+            json.dumps([name, cfg.get("regex", {}), cfg.get("lexicons", {})], ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+
+    def L(self, name: str) -> List[str]:
+        return self.LEX.get(name, [])
+
+    def RXget(self, name: str) -> re.Pattern:
+        return self.RX.get(name, self._rx_default)
+
+    def find_spans(self, sentence: str, lexicons: Iterable[str] = HIT_LEXICONS) -> List[Tuple[int, int, str, str]]:
+        """Character spans (start, end, lexicon, term) of every whole-word hit (기본: 상세 보기용 HIT_LEXICONS)."""
+        s = sentence.strip()
+        spans = []
+        for lexicon in lexicons:
+            for w, rx in self._lex_rx.get(lexicon, ()):
+                if w in s:
+                    spans.extend((m.start(), m.end(), lexicon, w) for m in rx.finditer(s))
+        spans.sort()
+        return spans
 
-def analyze_text(text: str, ruleset: str = None) -> List[Dict[str, Any]]:
+    def extract_features(self, sentence: str, *, with_hits: bool = True,
+                         indicators: Optional[Dict[str, bool]] = None) -> Dict[str, Any]:
+        s = sentence.strip()
+        ind, counts = self._scanner.scan(s)[0]
+        if indicators:
+            # 외부 검증 결과로 정규식 지표를 덮어쓴다 (예: verify.py의 링크 도달 여부 → has_url)
+            ind = {**ind, **indicators}
+        out = self.features_from_scan(s, ind, counts)
+        if with_hits:
+            # 히트/스팬은 상세 보기·하이라이트에만 필요 — 점수 전용 경로에서는 건너뛴다
+            spans = self.find_spans(s)
+            out["hits"] = hits_from_spans(spans)
+            out["spans"] = spans
+        return out
+
+    def features_from_scan(self, s: str, ind: Dict[str, bool], counts: Dict[str, int]) -> Dict[str, Any]:
+        """Feature dict from precomputed regex indicators and lexicon counts (see _Scanner)."""
+        # regex-based indicators
+        has_number_unit = ind["has_number_unit"]
+        has_year = ind["has_year"]
+        has_scope = ind["has_scope"]
+        has_url = ind["has_url"]
+        has_award_rating = ind["has_award_or_rating"]
+        has_money = ind["has_money"]
+        has_time_phrase = ind["has_time_phrase"]
+        has_percent_change = ind["has_percent_change"]
+
+        # report-specific
+        has_citation_sq = ind["has_citation_square"]
+        has_citation_yr = ind["has_citation_year"]
+        has_doi = ind["has_doi"]
+        has_fig_table = ind["has_fig_table"]
+        has_stats = ind["has_stats"]
+
+        # lexicon counts
+        count = counts.get
+        c_vague = count("vague", 0)
+        c_overclaim = count("overclaim", 0)
+        c_future = count("future", 0)
+        c_cov_risky = count("coverage_risky", 0)
+        c_cov_clarify = count("coverage_clarifier", 0)
+        c_standards = count("standards", 0) + count("methodology", 0)
+        c_thirdparty = count("third_party", 0)
+        c_offset_terms = count("offset_terms", 0)
+        c_greenhot = count("labels_greenwashing_hot", 0)
+
+        in_category = any(
+            count(name, 0) > 0
+            for name in ["emissions", "energy", "packaging", "waste", "water", "biodiversity", "chemicals", "transport"]
+        )
+
+        # Evidence score
+        evidence = 0
+        evidence += 3 if has_number_unit else 0
+        evidence += 3 if has_year else 0
+        evidence += 3 if c_standards > 0 else 0
+        evidence += 4 if c_thirdparty > 0 else 0
+        evidence += 2 if has_url else 0
+        evidence += 1 if has_award_rating else 0
+        evidence += 1 if has_money else 0
+        evidence += 1 if in_category else 0
+        if self.name == "report":
+            evidence += 2 if (has_citation_sq or has_citation_yr) else 0
+            evidence += 2 if has_doi else 0
+            evidence += 1 if has_fig_table else 0
+            evidence += 2 if has_stats else 0
+        evidence = min(16, evidence)
+
+        # Vagueness
+        vagueness = 0
+        vagueness += min(8, c_vague)
+        vagueness += 2 if c_overclaim > 0 else 0
+        vagueness += 2 if c_future > 0 else 0
+        vagueness += 1 if c_greenhot > 0 else 0
+        if self.name == "report" and self.LEX.get("weasel"):
+            if any(w in s for w in self.L("weasel")):
+                vagueness = min(16, vagueness + 1)
+
+        # Coverage
+        coverage_penalty = 2 if c_cov_risky > 0 else 0
+        if coverage_penalty and c_cov_clarify > 0:
+            coverage_penalty = max(0, coverage_penalty - 1)
+
+        # Temporal
+        temporal_penalty = 0
+        if c_future > 0 and not has_year:
+            temporal_penalty += 2
+        if c_future > 0 and not (has_time_phrase or has_percent_change):
+            temporal_penalty += 1
+        if has_time_phrase or has_percent_change:
+            temporal_penalty = max(0, temporal_penalty - 1)
+        temporal_penalty = min(4, temporal_penalty)
+
+        # Language
+        language_risk = min(8, (4 if c_overclaim > 0 else 0) + min(4, c_vague))
+
+        # Offset
+        offset_flag = 1 if (c_offset_terms > 0 and not (has_year or has_number_unit or has_scope)) else 0
+
+        return {
+            "has_number_unit": has_number_unit,
+            "has_year": has_year,
+            "has_scope": has_scope,
+            "has_url": has_url,
+            "has_award_or_rating": has_award_rating,
+            "has_money": has_money,
+            "has_time_phrase": has_time_phrase,
+            "has_percent_change": has_percent_change,
+            "has_citation_square": has_citation_sq,
+            "has_citation_year": has_citation_yr,
+            "has_doi": has_doi,
+            "has_fig_table": has_fig_table,
+            "has_stats": has_stats,
+            "count_vague": c_vague,
+            "count_overclaim": c_overclaim,
+            "count_future": c_future,
+            "count_coverage_risky": c_cov_risky,
+            "count_coverage_clarifier": c_cov_clarify,
+            "count_standards_method": c_standards,
+            "count_third_party": c_thirdparty,
+            "count_greenhot": c_greenhot,
+            "offset_flag": offset_flag,
+            "evidence_score": evidence,
+            "vagueness_score": vagueness,
+            "coverage_penalty": coverage_penalty,
+            "temporal_penalty": temporal_penalty,
+            "language_risk": language_risk,
+        }
+
+    def label_for(self, risk: float) -> str:
+        return "High" if risk >= self.TH.get("high", 70) else ("Medium" if risk >= self.TH.get("medium", 40) else "Low")
+
+    def score_sentence(self, sentence: str, *, with_hits: bool = True) -> Dict[str, Any]:
+        return self.score_features(self.extract_features(sentence, with_hits=with_hits))
+
+    def score_features(self, f: Dict[str, Any]) -> Dict[str, Any]:
+        """Add risk/label to an extracted feature dict (in place)."""
+        W = self.W
+        risk = 100 * (
+            W.get("evidence_inverse", 0.30) * (1 - f.get("evidence_score", 0) / 16)
+            + W.get("vagueness", 0.22) * (f.get("vagueness_score", 0) / 16)
+            + W.get("language", 0.12) * (f.get("language_risk", 0) / 8)
+            + W.get("coverage", 0.10) * (f.get("coverage_penalty", 0) / 6)
+            + W.get("temporal", 0.16) * (f.get("temporal_penalty", 0) / 4)
+            + W.get("offset_risk", 0.10) * f.get("offset_flag", 0)
+        )
+        risk = max(0, min(100, round(risk, 1)))
+        f["risk"] = risk
+        f["label"] = self.label_for(risk)
+        return f
+
+    def score_batch(self, sentences: List[str], *, with_hits: bool = False) -> List[Dict[str, Any]]:
+        """Score many sentences (analyze_text와 같은 score_features 경로 — 행렬 곱은 합산 순서가 달라
+        반올림 경계에서 ±0.1 차이가 나므로 쓰지 않는다; calibrate.py도 구성요소별로 같은 순서로 더한다)."""
+        return [{"sentence": s, **self.score_features(self.extract_features(s, with_hits=with_hits))}
+                for s in sentences]
+
+    def analyze_text(self, text: str, *, with_hits: bool = True) -> List[Dict[str, Any]]:
+        return [{"sentence": s, **self.score_sentence(s, with_hits=with_hits)} for s in split_sentences(text)]
+
+class MultiEngine:
+    """Scores sentences under several rulesets at once (문장 분리·정규식·렉시콘 검사를 공유)."""
+
+    def __init__(self, engines: List[RuleEngine]):
+        self.engines = engines
+        self.names = [e.name for e in engines]
+        self._scanner = _Scanner(engines)
+
+    def score_sentence(self, sentence: str, *, with_hits: bool = False) -> Dict[str, Dict[str, Any]]:
+        s = sentence.strip()
+        out: Dict[str, Dict[str, Any]] = {}
+        for eng, (ind, counts) in zip(self.engines, self._scanner.scan(s)):
+            f = eng.features_from_scan(s, ind, counts)
+            if with_hits:
+                spans = eng.find_spans(s)
+                f["hits"] = hits_from_spans(spans)
+                f["spans"] = spans
+            out[eng.name] = eng.score_features(f)
+        return out
+
+    def analyze_text(self, text: str, *, with_hits: bool = False) -> List[Dict[str, Any]]:
+        """Rows with per-ruleset columns side by side: ad_risk, report_risk, ad_label, ..."""
+        rows: List[Dict[str, Any]] = []
+        for s in split_sentences(text):
+            row: Dict[str, Any] = {"sentence": s}
+            for name, f in self.score_sentence(s, with_hits=with_hits).items():
+                row.update({f"{name}_{k}": v for k, v in f.items()})
+            rows.append(row)
+        return rows
+
+_MULTI: Dict[Tuple[str, ...], MultiEngine] = {}
+
+def get_multi_engine(rulesets: Tuple[str, ...] = ("ad", "report")) -> MultiEngine:
+    key = tuple(rulesets)
+    if key not in _MULTI:
+        _MULTI[key] = MultiEngine([get_engine(r) for r in key])
+    return _MULTI[key]
+
+# initial load
+load_rules("ad")
+
+def extract_features(sentence: str, *, with_hits: bool = True) -> Dict[str, Any]:
+    return _ENGINE.extract_features(sentence, with_hits=with_hits)
+
+def score_sentence(sentence: str, *, with_hits: bool = True) -> Dict[str, Any]:
+    return _ENGINE.score_sentence(sentence, with_hits=with_hits)
+
+def score_batch(sentences: List[str], ruleset: str = None, *, with_hits: bool = False) -> List[Dict[str, Any]]:
+    eng = get_engine(ruleset) if ruleset else _ENGINE
+    return eng.score_batch(sentences, with_hits=with_hits)
+
+def analyze_text(text: str, ruleset: str = None, *, with_hits: bool = True) -> List[Dict[str, Any]]:
     if ruleset and ruleset != CURRENT_RULESET:
         load_rules(ruleset)
-    sents = split_sentences(text)
-    rows: List[Dict[str, Any]] = []
-    for s in sents:
-        sc = score_sentence(s)
-        rows.append({"sentence": s, **sc})
-    return rows
-# -----------------------------------------------------------------------------
+    return _ENGINE.analyze_text(text, with_hits=with_hits)
+
+def analyze_multi(text: str, rulesets: Tuple[str, ...] = ("ad", "report"), *, with_hits: bool = False) -> List[Dict[str, Any]]:
+    """Analyze once under several rulesets; 결과 컬럼은 '<ruleset>_<feature>' 형식."""
+    return get_multi_engine(tuple(rulesets)).analyze_text(text, with_hits=with_hits)
@@ -0,0 +1,38 @@
+# scripts/bench_features.py — 특징 추출 처리량 벤치마크 (히트 포함 vs 점수 전용)
+# -----------------------------------------------------------------------------
+# 사용:  python scripts/bench_features.py [--repeat 20]
+# -----------------------------------------------------------------------------
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import rules  # noqa: E402
+
+def corpus() -> list:
+    text = (ROOT / "data" / "samples.csv").read_text(encoding="utf-8") + "\n" + (ROOT / "README.md").read_text(encoding="utf-8")
+    return rules.split_sentences(text)
+
+def bench(fn, sents, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(sents)
+    return len(sents) * repeat / (time.perf_counter() - t0)
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    sents = corpus()
+    print(f"{len(sents)} sentences × {args.repeat}")
+    for name in ("ad", "report"):
+        eng = rules.get_engine(name)
+        full = bench(lambda ss: eng.score_batch(ss, with_hits=True), sents, args.repeat)
+        fast = bench(lambda ss: eng.score_batch(ss, with_hits=False), sents, args.repeat)
+        print(f"{name:<7} with hits {full:>10,.0f} sent/s   score-only {fast:>10,.0f} sent/s   ({fast / full:.2f}x)")
+
+if __name__ == "__main__":
+    main()
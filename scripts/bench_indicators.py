@@ -0,0 +1,51 @@
+# scripts/bench_indicators.py — 정규식 지표 검사: 패턴별 search vs 첫 글자 사전 필터 (ad/report)
+# -----------------------------------------------------------------------------
+# 두 경로의 결과가 같은지 먼저 확인한 뒤, 문장당 처리량을 best-of-N으로 비교한다.
+# 사용:  python scripts/bench_indicators.py [--repeat 20] [--rounds 5]
+# -----------------------------------------------------------------------------
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import rules  # noqa: E402
+
+def corpus() -> list:
+    text = (ROOT / "data" / "samples.csv").read_text(encoding="utf-8") + "\n" + (ROOT / "README.md").read_text(encoding="utf-8")
+    return [s.strip() for s in rules.split_sentences(text)]
+
+def bench(fn, sents, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for s in sents:
+            fn(s)
+    return len(sents) * repeat / (time.perf_counter() - t0)
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+    sents = corpus()
+    print(f"{len(sents)} sentences × {args.repeat}, best of {args.rounds}")
+    for name in ("ad", "report"):
+        sc = rules.get_engine(name)._scanner
+        per_pattern = lambda s: [rx.search(s) is not None for rx in sc.patterns]  # noqa: E731
+        assert all(sc.search_all(s) == per_pattern(s) for s in sents), f"{name}: prefilter changed results"
+        best = {"per-pattern": 0.0, "prefiltered": 0.0}
+        for _ in range(args.rounds):   # 번갈아 돌려 기기 부하 변동을 양쪽에 고르게
+            best["per-pattern"] = max(best["per-pattern"], bench(per_pattern, sents, args.repeat))
+            best["prefiltered"] = max(best["prefiltered"], bench(sc.search_all, sents, args.repeat))
+        gated = sum(j >= 0 for j in sc.gate_of)
+        print(f"  {name:<7} {len(sc.patterns)} patterns ({gated} gated by {len(sc.gates)} classes): "
+              f"per-pattern {best['per-pattern']:>9,.0f}/s   prefiltered {best['prefiltered']:>9,.0f}/s   "
+              f"×{best['prefiltered'] / best['per-pattern']:.2f}")
+        for g in sc.gates:
+            opened = sum(g.search(s) is not None for s in sents)
+            print(f"      gate {g.pattern:<30} open in {opened}/{len(sents)}")
+
+if __name__ == "__main__":
+    main()
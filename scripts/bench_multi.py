@@ -0,0 +1,49 @@
+# scripts/bench_multi.py — ad+report 동시 분석(analyze_multi) vs 규칙별 2회 분석 비교
+# -----------------------------------------------------------------------------
+# 사용:  python scripts/bench_multi.py [--repeat 20] [--rounds 5]   (번갈아 실행한 best-of-rounds)
+# -----------------------------------------------------------------------------
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import rules  # noqa: E402
+
+def timed(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+    text = (ROOT / "data" / "samples.csv").read_text(encoding="utf-8") + "\n" + (ROOT / "README.md").read_text(encoding="utf-8")
+    ad, rep = rules.get_engine("ad"), rules.get_engine("report")
+    rules.get_multi_engine()
+
+    # 결과 동일성 확인
+    multi = rules.analyze_multi(text)
+    for name, eng in (("ad", ad), ("report", rep)):
+        single = eng.analyze_text(text, with_hits=False)
+        assert [r["risk"] for r in single] == [r[f"{name}_risk"] for r in multi], name
+
+    t_ad = t_rep = t_multi = float("inf")
+    for _ in range(args.rounds):   # 번갈아 돌려 기기 부하 변동을 고르게, 각자 최솟값 사용
+        t_ad = min(t_ad, timed(lambda: ad.analyze_text(text, with_hits=False), args.repeat))
+        t_rep = min(t_rep, timed(lambda: rep.analyze_text(text, with_hits=False), args.repeat))
+        t_multi = min(t_multi, timed(lambda: rules.analyze_multi(text), args.repeat))
+    print(f"{len(multi)} sentences, best of {args.rounds}")
+    print(f"ad only      {t_ad * 1000:8.2f} ms")
+    print(f"report only  {t_rep * 1000:8.2f} ms")
+    print(f"ad + report  {(t_ad + t_rep) * 1000:8.2f} ms  (two runs)")
+    print(f"multi        {t_multi * 1000:8.2f} ms  ({t_multi / max(t_ad, t_rep):.2f}x of the slower single run, "
+          f"{t_multi / (t_ad + t_rep):.2f}x of two runs)")
+
+if __name__ == "__main__":
+    main()
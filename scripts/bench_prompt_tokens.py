@@ -0,0 +1,166 @@
+# scripts/bench_prompt_tokens.py — LLM 입력 토큰 벤치마크 (이전 템플릿 vs 공유 접두부 + 압축 페이로드)
+# -----------------------------------------------------------------------------
+# 문장당 입력 토큰과, 분당 토큰 한도(TPM) 안에서 처리 가능한 문장 수를 비교한다.
+# 공유 접두부가 캐싱 최소 길이(llm.CACHE_MIN_PREFIX_TOKENS)를 넘는지도 보인다. 넘는 경우에만
+# 접두부를 캐시 할인가로 환산한 문장당 토큰을 함께 출력한다 (캐시된 토큰도 TPM 한도에는 그대로 집계).
+# tiktoken이 설치되어 있으면 정확히, 없으면 llm.count_tokens의 근사치로 센다.
+# --live: 같은 요청을 실제 API로 연달아 보내 응답의 cached_tokens를 출력한다 (OPENAI_API_KEY 필요).
+# 사용:  python scripts/bench_prompt_tokens.py [--k 1 5 10] [--tpm 200000] [--cached-price 0.5] [--live]
+# -----------------------------------------------------------------------------
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import llm  # noqa: E402
+import rules  # noqa: E402
+
+# ---- 이전 버전 프롬프트 (비교 기준, 변경 전 llm.py 그대로) ----
+_LEGACY = {}
+
+_LEGACY["ad_system"] = ("""당신은 환경광고/표시의 사실성·그린워싱 위험을 점검하는 분석가다.
+1) 왜 위험한지 분류/설명하고, 2) 입력 텍스트에 실제 존재하는 URL만 existing_citations에 넣고,
+3) 부족한 근거를 채우기 위한 evidence_needed와 검색 쿼리를 제안하라.
+분류 태그: ["모호어","과장표현","미래시제·계획부재","범위과대","근거부족","오프셋의존","기한·지표부재"].
+링크 지어내지 말 것. 한국어로 답하고, 출력은 JSON 배열 하나만.""")
+
+_LEGACY["ad_user"] = """다음 위험 문장 리스트를 분석해줘.
+[메타]
+- 문서종류: 환경 광고/표시
+- 문장_리스트: {sentences_json}
+- 문장별 사전점수(참고): {scores_json}
+
+[예시]
+- 입력: {{"id": 1, "text": "우리의 혁신적인 기술로 지구를 위한 지속가능한 미래를 만듭니다."}}
+- 출력:
+{{
+  "id": 1,
+  "risk_reasons": ["모호어", "근거부족", "기한·지표부재"],
+  "explanation": "'혁신적인 기술', '지속가능한 미래' 등은 의미가 불분명한 마케팅 용어입니다. 어떤 기술인지, '지속가능성'을 어떤 기준으로 측정하는지 명시해야 합니다.",
+  "existing_citations": [],
+  "evidence_needed": ["기술의 구체적인 원리/명칭", "지속가능성 기여도 정량지표(예: tCO2e 감축량)", "기준연도/목표연도", "외부 기술 검증 보고서"],
+  "suggested_queries": ["(회사명) 지속가능성 보고서", "(기술명) 환경 영향 평가 결과"],
+  "reference_standards": ["ISO 14021", "FTC Green Guides"],
+  "confidence": 0.9
+}}
+
+[요구]
+각 문장마다 위 예시와 같은 JSON 항목으로만 출력:
+{{
+  "id": <원문 id>,
+  "risk_reasons": ["모호어","범위과대",...],
+  "explanation": "<누락된 지표/기간/적용범위/단위 등>",
+  "existing_citations": [],
+  "evidence_needed": ["정량지표(tCO2e, kWh)","기준연도/목표연도","적용범위(조직/제품/공급망)","외부검증/인증"],
+  "suggested_queries": ["<검증용 검색쿼리 #1>","<검증용 검색쿼리 #2>"],
+  "reference_standards": ["GHG Protocol","SBTi","ISO 14064"],
+  "confidence": 0.0
+}}
+출력은 JSON 배열 하나만."""
+
+_LEGACY["report_system"] = ("""당신은 일반 보고서의 근거성·명확성·재현가능성을 점검하는 에디터다.
+문장의 애매/허세/근거부족 요소를 지적하고, 무엇을(데이터·방법·지표·표/그림·인용) 추가할지 제안하라.
+입력에 존재하는 URL만 existing_citations에 넣고, 없으면 빈 배열. 한국어로, JSON 배열 하나만.""")
+
+_LEGACY["report_user"] = """다음 위험 문장 리스트를 분석해줘.
+[메타]
+- 문서종류: 일반 보고서
+- 문장_리스트: {sentences_json}
+- 문장별 사전점수(참고): {scores_json}
+
+[예시]
+- 입력: {{"id": 1, "text": "이 시스템은 전반적으로 상당한 성능 개선을 보였습니다."}}
+- 출력:
+{{
+  "id": 1,
+  "issues": ["weasel word", "근거/출처 부재", "통계/표본 정보 부족"],
+  "what_to_add": {{
+    "metrics": ["'성능 개선'의 구체적 지표(예: 응답시간, 처리량)", "개선율(%) 또는 절대수치 변화량", "측정 기간"],
+    "method": ["성능 측정 방법론", "테스트 환경(HW/SW 스펙)", "비교 대상(Baseline) 시스템 정보"],
+    "tables_figures": ["Table: 전후 성능 지표 비교표", "Fig: 시간에 따른 성능 변화 그래프"],
+    "citations": ["내부 성능 테스트 결과 보고서 링크"]
+  }},
+  "existing_citations": [],
+  "suggested_queries": ["시스템 성능 벤치마크 방법론", "(시스템명) 성능 측정 논문"],
+  "confidence": 0.9
+}}
+
+[요구]
+각 문장마다 위 예시와 같은 JSON 항목으로만 출력:
+{{
+  "id": <원문 id>,
+  "issues": ["weasel word","근거/출처 부재","범위/대상 불명확","기간/마일스톤 없음","통계/표본 정보 부족"],
+  "what_to_add": {{
+    "metrics": ["정확한 수치+단위","기준연도/기간","성공기준(KPI)"],
+    "method": ["표본(n)/수집방법","통계검정(p, CI)","재현 가능한 절차(SOP)"],
+    "tables_figures": ["Fig: 프로세스/아키텍처","Table: 지표 정의/결과 요약"],
+    "citations": ["핵심 선행연구/표준","내부 로그/스크린샷","감사/검증보고서"]
+  }},
+  "existing_citations": [],
+  "suggested_queries": ["<근거 보강용 검색쿼리>"],
+  "confidence": 0.0
+}}
+출력은 JSON 배열 하나만."""
+
+def legacy_prompt(ruleset: str, items: list) -> tuple:
+    sentences = [{"id": int(it["id"]), "text": it["text"]} for it in items]
+    scores = {int(it["id"]): {"risk": it.get("risk"), "label": it.get("label")} for it in items}
+    user = _LEGACY[f"{ruleset}_user"].format(
+        sentences_json=json.dumps(sentences, ensure_ascii=False),
+        scores_json=json.dumps(scores, ensure_ascii=False),
+    )
+    return _LEGACY[f"{ruleset}_system"], user
+
+def compact_prompt(ruleset: str, items: list) -> tuple:
+    return (llm._AD_SYSTEM if ruleset == "ad" else llm._REPORT_SYSTEM), llm.build_payload(items)
+
+def sample_items(ruleset: str, k: int) -> list:
+    text = (ROOT / "data" / "samples.csv").read_text(encoding="utf-8") + "\n" + (ROOT / "README.md").read_text(encoding="utf-8")
+    rows = rules.get_engine(ruleset).score_batch(rules.split_sentences(text))
+    rows = sorted(rows, key=lambda r: -r["risk"])[:k]
+    return [{"id": i + 1, "text": r["sentence"], "risk": r["risk"], "label": r["label"]} for i, r in enumerate(rows)]
+
+def live(ruleset: str, k: int, calls: int) -> None:
+    """Send the same request `calls` times and print the provider-reported cached tokens."""
+    items = sample_items(ruleset, k)
+    run = llm.run_ad if ruleset == "ad" else llm.run_report
+    start = len(llm.USAGE)
+    for _ in range(calls):
+        run(items)
+    for i, r in enumerate(list(llm.USAGE)[start:], 1):
+        print(f"  live {ruleset:<7} call {i}: prompt {r['prompt_tokens']} tok, cached {r['cached_tokens']} tok, "
+              f"{r['latency_ms']:.0f} ms")
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--k", type=int, nargs="+", default=[1, 5, 10], help="호출당 문장 수")
+    ap.add_argument("--tpm", type=int, default=200_000, help="분당 입력 토큰 한도")
+    ap.add_argument("--cached-price", type=float, default=0.5, help="캐시된 입력 토큰의 상대 가격 (모델별 요금표)")
+    ap.add_argument("--live", action="store_true", help="실제 API 호출로 cached_tokens 확인 (OPENAI_API_KEY 필요)")
+    ap.add_argument("--calls", type=int, default=2, help="--live: 같은 요청을 보낼 횟수")
+    args = ap.parse_args()
+    llm.count_tokens("")
+    print(f"tokenizer: {llm.TOKENIZER} ({llm.MODEL})")
+    for ruleset in ("ad", "report"):
+        system = llm._AD_SYSTEM if ruleset == "ad" else llm._REPORT_SYSTEM
+        prefix = llm.count_tokens(system)
+        cacheable = prefix >= llm.CACHE_MIN_PREFIX_TOKENS
+        print(f"{ruleset:<7} shared prefix {prefix} tok (cache minimum {llm.CACHE_MIN_PREFIX_TOKENS}: "
+              f"{'cacheable' if cacheable else 'TOO SHORT, never cached'})")
+        for k in args.k:
+            items = sample_items(ruleset, k)
+            old = llm.prompt_tokens(*legacy_prompt(ruleset, items))
+            new = llm.prompt_tokens(*compact_prompt(ruleset, items))
+            n = len(items)
+            billed = f", billed ≈ {(new - prefix * (1 - args.cached_price)) / n:.1f} with cached prefix" if cacheable else ""
+            print(f"  k={n:<3} before {old / n:>7.1f} tok/sent   after {new / n:>7.1f} tok/sent "
+                  f"({(1 - new / old) * 100:4.1f}% less{billed})   "
+                  f"sent/min @ {args.tpm:,} TPM: {args.tpm * n // old:,} → {args.tpm * n // new:,}")
+        if args.live:
+            live(ruleset, max(args.k), args.calls)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# scripts/loadtest.py — server.py 부하 테스트 (localhost)
+# -----------------------------------------------------------------------------
+# 사용:  python server.py &   then   python scripts/loadtest.py -n 2000 -c 32
+# -----------------------------------------------------------------------------
+import argparse
+import csv
+import http.client
+import json
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+SAMPLES = Path(__file__).resolve().parent.parent / "data" / "samples.csv"
+
+def _load_sentences() -> List[str]:
+    with open(SAMPLES, encoding="utf-8") as f:
+        return [r["sentence"] for r in csv.DictReader(f) if r.get("sentence")]
+
+def _pct(vals: List[float], q: float) -> float:
+    if not vals:
+        return 0.0
+    v = sorted(vals)
+    return v[min(len(v) - 1, int(round(q * (len(v) - 1))))]
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Load test for the VeriAI scoring service")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("-n", "--requests", type=int, default=2000)
+    ap.add_argument("-c", "--concurrency", type=int, default=32)
+    ap.add_argument("--route", default="/score", choices=["/score", "/score/batch"])
+    ap.add_argument("--batch-size", type=int, default=16, help="/score/batch 요청당 문장 수")
+    ap.add_argument("--ruleset", default="ad", choices=["ad", "report"])
+    args = ap.parse_args()
+
+    sents = _load_sentences()
+    lat: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(args.requests))
+
+    def worker() -> None:
+        conn = http.client.HTTPConnection(args.host, args.port, timeout=30)
+        local: List[float] = []
+        for i in counter:
+            if args.route == "/score":
+                body = {"sentence": sents[i % len(sents)], "ruleset": args.ruleset}
+            else:
+                body = {"sentences": [sents[(i + j) % len(sents)] for j in range(args.batch_size)], "ruleset": args.ruleset}
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", args.route, json.dumps(body, ensure_ascii=False).encode("utf-8"),
+                             {"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status != 200:
+                    with lock:
+                        errors[0] += 1
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(args.host, args.port, timeout=30)
+                continue
+            local.append((time.perf_counter() - t0) * 1000)
+        conn.close()
+        with lock:
+            lat.extend(local)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    per_req = args.batch_size if args.route == "/score/batch" else 1
+    print(f"requests: {len(lat)} ok / {errors[0]} errors in {elapsed:.2f}s")
+    print(f"throughput: {len(lat) / elapsed:.1f} req/s, {len(lat) * per_req / elapsed:.1f} sentences/s")
+    print(f"client latency: p50={_pct(lat, 0.50):.2f}ms p99={_pct(lat, 0.99):.2f}ms")
+
+    conn = http.client.HTTPConnection(args.host, args.port, timeout=10)
+    conn.request("GET", "/stats")
+    print("server stats:", json.dumps(json.loads(conn.getresponse().read()), ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# scripts/verify_fixture.py — verify.py를 로컬 HTTP 서버로 확인 (네트워크 불필요)
+# -----------------------------------------------------------------------------
+# 127.0.0.1 임의 포트에 고정 응답 서버를 띄우고 다음을 검사한다.
+#   200 / 리다이렉트 / 404 / 타임아웃 / HEAD 거부(405→GET) / DOI 리졸버 / 근거 점수 재계산
+#   호스트별 동시 요청 제한, 두 번째 실행은 캐시에서만 응답
+# 사용:  python scripts/verify_fixture.py
+# -----------------------------------------------------------------------------
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import verify  # noqa: E402
+
+class Fixture(BaseHTTPRequestHandler):
+    hits = 0
+    active: dict = {}
+    max_active: dict = {}
+    lock = threading.Lock()
+
+    def log_message(self, *args):  # 조용히
+        pass
+
+    def _respond(self, body: bool) -> None:
+        cls = type(self)
+        host = self.headers.get("Host", "")
+        with cls.lock:
+            cls.hits += 1
+            cls.active[host] = cls.active.get(host, 0) + 1
+            cls.max_active[host] = max(cls.max_active.get(host, 0), cls.active[host])
+        try:
+            path = self.path
+            if path.startswith("/slow"):
+                time.sleep(1.0)
+                code = 200
+            elif path.startswith("/busy"):
+                time.sleep(0.1)
+                code = 200
+            elif path.startswith("/redirect"):
+                self.send_response(301)
+                self.send_header("Location", "/ok")
+                self.end_headers()
+                return
+            elif path.startswith("/doi/10.1234/live"):
+                self.send_response(302)
+                self.send_header("Location", "/ok")
+                self.end_headers()
+                return
+            elif path.startswith("/nohead") and not body:
+                code = 405
+            elif path.startswith(("/ok", "/nohead")):
+                code = 200
+            else:
+                code = 404
+            self.send_response(code)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            if body:
+                self.wfile.write(b"ok")
+        finally:
+            with cls.lock:
+                cls.active[host] -= 1
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Fixture)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    base = f"http://127.0.0.1:{port}"
+    other = f"http://localhost:{port}"  # 다른 호스트: 타임아웃 후에도 서버에서 계속 도는 요청을 따로 셈
+    cache_path = Path(tempfile.mkdtemp()) / "verify.json"
+
+    def verifier() -> verify.Verifier:
+        return verify.Verifier(cache=verify.LinkCache(cache_path), timeout=0.3, per_host=2,
+                               doi_resolver=f"{base}/doi/")
+
+    text = "\n".join([
+        f"실험 결과는 공개 저장소({base}/ok)에 있다.",
+        f"원자료는 {base}/gone 에서 받을 수 있다.",
+        f"자세한 방법은 {base}/redirect 참고.",
+        f"부록은 {other}/slow 에 있다.",
+        f"요약표는 {base}/nohead 에 있다.",
+        "선행연구 doi 10.1234/live 및 10.1234/dead 를 참조했다.",
+    ] + [f"추가 자료 {base}/busy/{i}" for i in range(8)])
+
+    rows, rep = verify.verify_text(text, "report", verifier())
+    status = {l["target"].replace(base, "").replace(other, ""): l for r in rows for l in r.get("links", ())}
+    assert status["/ok"]["ok"] and status["/ok"]["status"] == 200
+    assert not status["/gone"]["ok"] and status["/gone"]["status"] == 404
+    assert status["/redirect"]["ok"] and status["/redirect"]["redirected"]
+    assert not status["/slow"]["ok"] and status["/slow"]["error"]
+    assert status["/nohead"]["ok"], status["/nohead"]
+    assert status["doi:10.1234/live"]["ok"] and not status["doi:10.1234/dead"]["ok"]
+    peak = Fixture.max_active[f"127.0.0.1:{port}"]
+    assert peak <= 2, Fixture.max_active
+
+    by_sent = {r["sentence"]: r for r in rows}
+    dead = next(r for s, r in by_sent.items() if "/gone" in s)
+    live = next(r for s, r in by_sent.items() if "/ok" in s)
+    assert dead["has_url"] is False and live["has_url"] is True
+    assert any(c["sentence"] == dead["sentence"] and c["risk"] > c["prev_risk"] for c in rep["risk_changes"])
+    print(f"first run: {rep['targets']} links, live {rep['live']}, dead {rep['dead']}, redirected {rep['redirected']}, "
+          f"max concurrent per host {peak}, {len(rep['risk_changes'])} risk changes")
+
+    before = Fixture.hits
+    _, rep2 = verify.verify_text(text, "report", verifier())
+    assert Fixture.hits == before and rep2["cached"] == rep2["targets"], (Fixture.hits - before, rep2)
+    print(f"second run: {rep2['cached']}/{rep2['targets']} from cache, 0 requests")
+    server.shutdown()
+    print("ok")
+
+if __name__ == "__main__":
+    main()
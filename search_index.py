@@ -0,0 +1,359 @@
+# search_index.py — 분석 결과 문장 역색인 (한글 bigram 전문 검색 + 패싯 + 복합 조건)
+# -----------------------------------------------------------------------------
+# 분석 시점에 한 번 색인해 두고, 검색마다 전체 표를 다시 훑지 않는다.
+#  - 본문: 소문자화한 문자 bigram → 문장 id 포스팅 (후보 교집합 후 부분문자열로 확정)
+#  - 패싯: label / ruleset / brand (코드 배열), 렉시콘 히트 그룹·단어 (포스팅)
+#  - 피처: has_* / *_score / risk 등 숫자 컬럼 (numpy 배열)
+#
+# 질의 문법: 대문자 AND/OR/NOT, 필드:값, 비교식 중 하나라도 있으면 조건 질의로 해석하고,
+# 아니면 입력 전체를 대소문자 무시 부분 문자열로 찾는다 (기존 키워드 검색과 동일).
+# 조건 질의 안에서 (AND는 생략 가능):
+#   친환경 인증                      본문 키워드 (각각 포함)
+#   "전 제품"                        공백 포함 구문
+#   overclaim hit / hit:overclaim    렉시콘 그룹 히트 (vague, overclaim, future, ...)
+#   overclaim:모든                   특정 단어 히트
+#   has_year / no has_year           불리언 피처 (no는 피처 이름 바로 앞에서만)
+#   risk>70  evidence_score<=3       숫자 비교 (> >= < <= = !=)
+#   label:High  ruleset:ad  brand:스타벅스
+#   A OR B, NOT A, ( ... )
+# 예: overclaim hit AND no has_year AND risk>70
+#
+# 사용:
+#   python search_index.py scored.jsonl --query "overclaim hit AND risk>70"
+# -----------------------------------------------------------------------------
+import argparse
+import json
+import operator
+import re
+import sys
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import rules
+
+class QueryError(ValueError):
+    pass
+
+_GROUP_OF = {lex: group for group, lexs in rules.HIT_GROUPS.items() for lex in lexs}
+_FACETS = ("label", "ruleset", "brand")
+_SKIP = {"sentence", "hits", "spans"}
+_OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+        "=": operator.eq, "==": operator.eq, "!=": operator.ne}
+
+def _bigrams(s: str) -> set:
+    return {s[i:i + 2] for i in range(len(s) - 1)}
+
+class SentenceIndex:
+    """Append-only inverted index over scored sentence rows (analyze_text/score_batch 형식)."""
+
+    def __init__(self):
+        self.sentences: List[str] = []
+        self._post: Dict[str, array] = {}            # "t:<bigram>" / "h:<group>" / "h:<group>:<term>"
+        self._num: Dict[str, array] = {}             # feature name → float32 값
+        self._codes: Dict[str, array] = {f: array("i") for f in _FACETS}
+        self._vocab: Dict[str, Dict[str, int]] = {f: {} for f in _FACETS}
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def nbytes(self) -> int:
+        """Approximate memory footprint (포스팅/컬럼 버퍼 + 문장 문자열; 질의는 추가 메모리를 남기지 않음)."""
+        n = sum(sys.getsizeof(s) for s in self.sentences)
+        n += sum(len(p) * p.itemsize for p in self._post.values())
+        n += sum(len(c) * c.itemsize for c in self._num.values()) + sum(len(c) * c.itemsize for c in self._codes.values())
+        return n
+
+    # ---- build ----
+    def add(self, rows: Iterable[Dict[str, Any]], *, ruleset: str, brand: Optional[str] = None) -> Tuple[int, int]:
+        """Append rows; returns their [start, end) id range. hits가 없으면 find_spans로 계산."""
+        eng = rules.get_engine(ruleset)
+        rows = list(rows)
+        start = len(self.sentences)
+        post = self._post
+        for i, r in enumerate(rows, start):
+            s = str(r.get("sentence", ""))
+            self.sentences.append(s)
+            low = s.lower()
+            keys = {"t:" + low[j:j + 2] for j in range(len(low) - 1)}
+            hits = r.get("hits")
+            if hits is None:
+                pairs = {(_GROUP_OF[lex], t) for _, _, lex, t in eng.find_spans(s)}
+            else:
+                pairs = {(g, t) for g, ts in hits.items() for t in ts}
+            for g, t in pairs:
+                keys.add(f"h:{g}")
+                keys.add(f"h:{g}:{t.lower()}")
+            for k in keys:
+                p = post.get(k)
+                if p is None:
+                    p = post[k] = array("i")
+                p.append(i)
+
+        # 패싯·숫자 컬럼은 배치 단위로 열 방향 추가
+        for f, vals in (("label", (r.get("label") for r in rows)),
+                        ("ruleset", (eng.name for _ in rows)),
+                        ("brand", ((brand if brand is not None else r.get("brand")) for r in rows))):
+            vocab = self._vocab[f]
+            self._codes[f].extend(vocab.setdefault(str(v) if v is not None else "", len(vocab)) for v in vals)
+        names = {k for r in rows[:1] for k, v in r.items() if k not in _SKIP and isinstance(v, (bool, int, float))}
+        names.update(self._num)
+        for k in names:
+            col = self._num.get(k)
+            if col is None:
+                col = self._num[k] = array("f", [0.0]) * start  # 이전 행은 0으로 채움
+            try:
+                vals = list(map(operator.itemgetter(k), rows))
+            except KeyError:
+                vals = [r.get(k) or 0 for r in rows]
+            col.frombytes(np.asarray(vals, dtype=np.float32).tobytes())
+
+        return start, len(self.sentences)
+
+    def add_dataframe(self, df, *, ruleset: str, brand: Optional[str] = None) -> Tuple[int, int]:
+        return self.add(df.to_dict("records"), ruleset=ruleset, brand=brand)
+
+    # ---- columns / postings ----
+    # 버퍼를 복사하지 않는 읽기 전용 numpy 뷰 (O(1)). 질의마다 사본을 캐시하면 결과 저장소가 센
+    # 크기(nbytes) 밖에서 메모리가 계속 늘어나므로 캐시하지 않는다. 뷰는 질의가 끝나면 사라지므로
+    # 이후 add()의 버퍼 확장을 막지 않는다.
+    @staticmethod
+    def _view(buf: array, dtype: Any) -> np.ndarray:
+        arr = np.frombuffer(buf, dtype=dtype)
+        arr.flags.writeable = False   # 여러 세션이 공유하는 색인
+        return arr
+
+    def _postings(self, key: str) -> np.ndarray:
+        p = self._post.get(key)
+        return self._view(p, np.int32) if p is not None else np.empty(0, dtype=np.int32)
+
+    def _column(self, name: str) -> np.ndarray:
+        if name in self._codes:
+            return self._view(self._codes[name], np.int32)
+        if name in self._num:
+            return self._view(self._num[name], np.float32)
+        raise QueryError(f"알 수 없는 필드: {name}")
+
+    def _mask_of(self, ids: np.ndarray) -> np.ndarray:
+        m = np.zeros(len(self), dtype=bool)
+        m[ids] = True
+        return m
+
+    # ---- predicates ----
+    def text_mask(self, q: str) -> np.ndarray:
+        q = q.lower()
+        if not q:
+            return np.ones(len(self), dtype=bool)
+        grams = sorted(_bigrams(q), key=lambda b: len(self._post.get(f"t:{b}", ())))
+        if not grams:
+            cand = np.arange(len(self))  # 한 글자 질의는 색인 없이 확인
+        else:
+            cand = self._postings(f"t:{grams[0]}")
+            for b in grams[1:]:
+                if cand.size == 0:
+                    break
+                cand = np.intersect1d(cand, self._postings(f"t:{b}"), assume_unique=True)
+        sents = self.sentences
+        return self._mask_of(np.fromiter((i for i in cand if q in sents[i].lower()), dtype=np.int64))
+
+    def hit_mask(self, group: str, term: Optional[str] = None) -> np.ndarray:
+        group = _GROUP_OF.get(group, group)
+        if group not in rules.HIT_GROUPS:
+            raise QueryError(f"알 수 없는 렉시콘 그룹: {group} (가능: {', '.join(rules.HIT_GROUPS)})")
+        key = f"h:{group}" if term is None else f"h:{group}:{term.lower()}"
+        return self._mask_of(self._postings(key))
+
+    def facet_mask(self, field: str, value: str) -> np.ndarray:
+        vocab = self._vocab[field]
+        code = vocab.get(value)
+        if code is None:  # 대소문자 무시 매칭 (label:high 등)
+            code = next((c for v, c in vocab.items() if v.lower() == value.lower()), -1)
+        return self._column(field) == code
+
+    def compare_mask(self, field: str, op: str, value: float) -> np.ndarray:
+        return _OPS[op](self._column(field), value)
+
+    def bool_mask(self, field: str) -> np.ndarray:
+        return self._column(field) != 0
+
+    # ---- query ----
+    def is_structured(self, query: str) -> bool:
+        """True if the query uses explicit syntax (대문자 AND/OR/NOT, 필드:값, 비교식)."""
+        for tok in re.split(r'[\s()]+', query):
+            if tok in _KEYWORDS:
+                return True
+            m = _CMP_RX.match(tok)
+            if m and m.group(1) in self._num:
+                return True
+            field, sep, value = tok.lstrip('"').partition(":")
+            if sep and value and _is_field(field):
+                return True
+        return False
+
+    def mask(self, query: str) -> np.ndarray:
+        """Boolean mask over all ids for a query string (빈 질의 = 전체, 조건 문법이 없으면 부분 문자열)."""
+        if not query.strip():
+            return np.ones(len(self), dtype=bool)
+        if not self.is_structured(query):
+            return self.text_mask(query)
+        return _Parser(self, query).parse()
+
+    def search(self, query: str, *, limit: Optional[int] = None) -> np.ndarray:
+        """Matching ids (ascending)."""
+        ids = np.flatnonzero(self.mask(query))
+        return ids[:limit] if limit is not None else ids
+
+    def facets(self, ids: Optional[np.ndarray] = None) -> Dict[str, Dict[str, int]]:
+        """Counts per facet value (label/ruleset/brand) for ids (None = 전체)."""
+        out: Dict[str, Dict[str, int]] = {}
+        for f in _FACETS:
+            col = self._column(f) if ids is None else self._column(f)[ids]
+            counts = np.bincount(col, minlength=len(self._vocab[f]))
+            out[f] = {v: int(counts[c]) for v, c in self._vocab[f].items() if counts[c]}
+        return out
+
+# ====== Query parser ==============================================================
+_TOKEN_RX = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+_CMP_RX = re.compile(r"^([A-Za-z_][\w]*)(>=|<=|!=|==|>|<|=)(-?\d+(?:\.\d+)?)$")
+_KEYWORDS = {"AND", "OR", "NOT"}
+
+def _is_field(field: str) -> bool:
+    return field.lower() in ("hit", "hits", *_FACETS) or field in _GROUP_OF or field in rules.HIT_GROUPS
+
+class _Parser:
+    """expr := and (OR and)* ; and := unary ((AND)? unary)* ; unary := (NOT|no <feature>) unary | atom"""
+
+    def __init__(self, index: SentenceIndex, query: str):
+        self.ix = index
+        self.toks: List[Tuple[str, str]] = []
+        pos = 0
+        while query[pos:].strip():
+            m = _TOKEN_RX.match(query, pos)
+            if not m or m.end() == pos:
+                raise QueryError("따옴표가 닫히지 않았습니다.")
+            pos = m.end()
+            if m.group(1):
+                self.toks.append(("(", "("))
+            elif m.group(2):
+                self.toks.append((")", ")"))
+            elif m.group(3) is not None:
+                self.toks.append(("str", m.group(3)))
+            elif m.group(4):
+                self.toks.append(("word", m.group(4)))
+        self.i = 0
+
+    def _peek(self, k: int = 0) -> Optional[Tuple[str, str]]:
+        j = self.i + k
+        return self.toks[j] if j < len(self.toks) else None
+
+    def _kw(self, tok: Optional[Tuple[str, str]], *words: str) -> bool:
+        """연산자는 대문자로만 인식 (소문자 and/or/not은 본문 키워드)."""
+        return tok is not None and tok[0] == "word" and tok[1] in words
+
+    def parse(self) -> np.ndarray:
+        m = self._or()
+        if self._peek() is not None:
+            raise QueryError(f"예상치 못한 토큰: {self._peek()[1]}")
+        return m
+
+    def _or(self) -> np.ndarray:
+        m = self._and()
+        while self._kw(self._peek(), "OR"):
+            self.i += 1
+            m = m | self._and()
+        return m
+
+    def _and(self) -> np.ndarray:
+        m = self._unary()
+        while True:
+            tok = self._peek()
+            if tok is None or tok[0] == ")" or self._kw(tok, "OR"):
+                return m
+            if self._kw(tok, "AND"):
+                self.i += 1
+            m = m & self._unary()
+
+    def _unary(self) -> np.ndarray:
+        nxt = self._peek(1)
+        if self._kw(self._peek(), "NOT") or (
+                self._kw(self._peek(), "no") and nxt is not None and nxt[0] == "word" and nxt[1] in self.ix._num):
+            self.i += 1
+            return ~self._unary()
+        return self._atom()
+
+    def _atom(self) -> np.ndarray:
+        tok = self._peek()
+        if tok is None:
+            raise QueryError("질의가 불완전합니다.")
+        self.i += 1
+        kind, val = tok
+        if kind == "(":
+            m = self._or()
+            if self._peek() is None or self._peek()[0] != ")":
+                raise QueryError("괄호가 닫히지 않았습니다.")
+            self.i += 1
+            return m
+        if kind == ")":
+            raise QueryError("짝이 맞지 않는 ')'")
+        if kind == "str":
+            return self.ix.text_mask(val)
+        ix = self.ix
+        if (val in _GROUP_OF or val in rules.HIT_GROUPS) and self._kw(self._peek(), "hit", "hits"):
+            self.i += 1
+            return ix.hit_mask(val)
+        m = _CMP_RX.match(val)
+        if m:
+            return ix.compare_mask(m.group(1), m.group(2), float(m.group(3)))
+        if ":" in val:
+            field, _, value = val.partition(":")
+            fl = field.lower()
+            if fl in ("hit", "hits"):
+                return ix.hit_mask(value)
+            if fl in _FACETS:
+                return ix.facet_mask(fl, value)
+            if field in _GROUP_OF or field in rules.HIT_GROUPS:
+                return ix.hit_mask(field, value)
+        if val in ix._num:
+            return ix.bool_mask(val)
+        return ix.text_mask(val)
+
+# ====== Batch store ===============================================================
+def index_jsonl(paths: Iterable[str], *, index: Optional[SentenceIndex] = None) -> SentenceIndex:
+    """Index ingest.py output (문장 레코드와 text 레코드의 sentences 모두)."""
+    ix = index or SentenceIndex()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if "error" in rec or "ruleset" not in rec:
+                    continue
+                rows = rec["sentences"] if "sentences" in rec else [rec]
+                ix.add(rows, ruleset=rec["ruleset"], brand=rec.get("brand"))
+    return ix
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Search scored sentences (ingest.py JSONL output)")
+    ap.add_argument("jsonl", nargs="+")
+    ap.add_argument("--query", "-q", required=True)
+    ap.add_argument("--limit", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    ix = index_jsonl(args.jsonl)
+    t1 = time.perf_counter()
+    ids = ix.search(args.query)
+    t2 = time.perf_counter()
+    print(f"indexed {len(ix)} sentences in {t1 - t0:.2f}s; {len(ids)} matches in {(t2 - t1) * 1000:.1f} ms")
+    print(json.dumps(ix.facets(ids), ensure_ascii=False))
+    risk = ix._column("risk") if "risk" in ix._num else None
+    for i in ids[:args.limit]:
+        r = f"{risk[i]:5.1f}  " if risk is not None else ""
+        print(f"  #{i:<7} {r}{ix.sentences[i][:100]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+# server.py — VeriAI 로컬 스코어링 HTTP 서비스 (asyncio + 프로세스 풀 + 마이크로 배칭)
+# -----------------------------------------------------------------------------
+# 실행:  python server.py --port 8765 --workers 4
+#
+#   POST /score        {"sentence": "...", "ruleset": "ad"}        -> 문장 1개 점수
+#   POST /score/batch  {"sentences": ["...", ...], "ruleset": "ad"} -> {"results": [...]}
+#   POST /analyze      {"text": "...", "ruleset": "report", "hits": false} -> {"results": [...]}
+#                      {"text": "...", "rulesets": ["ad", "report"]}  -> ad_*/report_* 컬럼 동시 반환
+#   GET  /stats        엔드포인트별 p50/p99 지연시간, 배치 크기
+#   GET  /health
+# -----------------------------------------------------------------------------
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import rules
+
+RULESETS = ("ad", "report")
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+# ====== Worker process side =======================================================
+def _worker_init() -> None:
+    # 규칙 엔진은 워커마다 한 번만 로딩/컴파일
+    for name in RULESETS:
+        rules.get_engine(name)
+
+def _score_batch(ruleset: str, sentences: List[str]) -> List[Dict[str, Any]]:
+    return rules.get_engine(ruleset).score_batch(sentences, with_hits=False)
+
+def _analyze(ruleset: str, text: str, with_hits: bool) -> List[Dict[str, Any]]:
+    return rules.get_engine(ruleset).analyze_text(text, with_hits=with_hits)
+
+def _analyze_multi(rulesets: Tuple[str, ...], text: str, with_hits: bool) -> List[Dict[str, Any]]:
+    return rules.analyze_multi(text, rulesets, with_hits=with_hits)
+
+# ====== Latency stats =============================================================
+class LatencyStats:
+    """Keeps the most recent latencies per route (ms) for p50/p99 reporting."""
+
+    def __init__(self, window: int = 10000):
+        self.window = window
+        self.samples: Dict[str, deque] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, route: str, ms: float) -> None:
+        self.samples.setdefault(route, deque(maxlen=self.window)).append(ms)
+        self.counts[route] = self.counts.get(route, 0) + 1
+
+    @staticmethod
+    def _pct(sorted_vals: List[float], q: float) -> float:
+        if not sorted_vals:
+            return 0.0
+        idx = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+        return round(sorted_vals[idx], 3)
+
+    def summary(self) -> Dict[str, Any]:
+        out = {}
+        for route, vals in self.samples.items():
+            v = sorted(vals)
+            out[route] = {
+                "count": self.counts.get(route, 0),
+                "p50_ms": self._pct(v, 0.50),
+                "p99_ms": self._pct(v, 0.99),
+                "max_ms": round(v[-1], 3) if v else 0.0,
+            }
+        return out
+
+# ====== Micro-batching ============================================================
+class MicroBatcher:
+    """Collects concurrent scoring requests per ruleset and dispatches them as one batch.
+
+    max_batch 문장이 모이거나 max_wait_ms가 지나면 프로세스 풀로 보낸다.
+    """
+
+    def __init__(self, pool: ProcessPoolExecutor, *, max_batch: int = 64, max_wait_ms: float = 5.0):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.tasks: List[asyncio.Task] = []
+        self.batches = 0
+        self.batched_sentences = 0
+
+    def start(self) -> None:
+        for name in RULESETS:
+            q: asyncio.Queue = asyncio.Queue()
+            self.queues[name] = q
+            self.tasks.append(asyncio.create_task(self._run(name, q)))
+
+    async def stop(self) -> None:
+        for t in self.tasks:
+            t.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def submit(self, ruleset: str, sentences: List[str]) -> List[Dict[str, Any]]:
+        fut = asyncio.get_running_loop().create_future()
+        await self.queues[ruleset].put((sentences, fut))
+        return await fut
+
+    async def _run(self, ruleset: str, q: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pending: List[Tuple[List[str], asyncio.Future]] = [await q.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(q.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            # 디스패치는 기다리지 않고 다음 배치 수집을 계속한다
+            loop.create_task(self._dispatch(ruleset, pending))
+
+    async def _dispatch(self, ruleset: str, pending: List[Tuple[List[str], asyncio.Future]]) -> None:
+        flat = [s for sents, _ in pending for s in sents]
+        self.batches += 1
+        self.batched_sentences += len(flat)
+        try:
+            rows = await asyncio.get_running_loop().run_in_executor(self.pool, _score_batch, ruleset, flat)
+        except Exception as e:
+            for _, fut in pending:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        i = 0
+        for sents, fut in pending:
+            if not fut.done():
+                fut.set_result(rows[i:i + len(sents)])
+            i += len(sents)
+
+# ====== HTTP ======================================================================
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+def _ruleset_of(body: Dict[str, Any]) -> str:
+    rs = body.get("ruleset") or "ad"
+    if rs not in RULESETS:
+        raise HTTPError(400, f"unknown ruleset: {rs}")
+    return rs
+
+class ScoringServer:
+    def __init__(self, *, workers: int, max_batch: int, max_wait_ms: float):
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_worker_init)
+        self.batcher = MicroBatcher(self.pool, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        self.stats = LatencyStats()
+        self.started = time.time()
+
+    # ---- handlers ----
+    async def score(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        s = body.get("sentence")
+        if not isinstance(s, str) or not s.strip():
+            raise HTTPError(400, "'sentence' must be a non-empty string")
+        rows = await self.batcher.submit(_ruleset_of(body), [s])
+        return rows[0]
+
+    async def score_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        sents = body.get("sentences")
+        if not isinstance(sents, list) or not all(isinstance(s, str) for s in sents):
+            raise HTTPError(400, "'sentences' must be a list of strings")
+        rows = await self.batcher.submit(_ruleset_of(body), sents) if sents else []
+        return {"results": rows}
+
+    async def analyze(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        text = body.get("text")
+        if not isinstance(text, str):
+            raise HTTPError(400, "'text' must be a string")
+        loop = asyncio.get_running_loop()
+        with_hits = bool(body.get("hits"))
+        multi = body.get("rulesets")
+        if multi is not None:
+            if not isinstance(multi, list) or not multi or any(r not in RULESETS for r in multi):
+                raise HTTPError(400, f"'rulesets' must be a non-empty list of {list(RULESETS)}")
+            rows = await loop.run_in_executor(self.pool, _analyze_multi, tuple(multi), text, with_hits)
+        else:
+            rows = await loop.run_in_executor(self.pool, _analyze, _ruleset_of(body), text, with_hits)
+        return {"results": rows}
+
+    def stats_summary(self) -> Dict[str, Any]:
+        b = self.batcher
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "routes": self.stats.summary(),
+            "batches": b.batches,
+            "avg_batch_size": round(b.batched_sentences / b.batches, 2) if b.batches else 0.0,
+        }
+
+    async def route(self, method: str, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        if path == "/health":
+            return {"status": "ok"}
+        if path == "/stats":
+            return self.stats_summary()
+        handlers = {"/score": self.score, "/score/batch": self.score_batch, "/analyze": self.analyze}
+        h = handlers.get(path)
+        if h is None:
+            raise HTTPError(404, f"no route: {path}")
+        if method != "POST":
+            raise HTTPError(405, "use POST")
+        return await h(body)
+
+    # ---- connection loop (HTTP/1.1 keep-alive) ----
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, _ = line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                t0 = time.perf_counter()
+                path = target.split("?", 1)[0]
+                status, payload = 200, None
+                length = -1                 # 본문 길이를 모르면 다음 요청 경계도 모름 → 연결 종료
+                try:
+                    cl = headers.get("content-length") or "0"
+                    if not (cl.isascii() and cl.isdigit()):   # int()는 "+5", "1_000", "-1"도 받아들임
+                        raise HTTPError(400, "invalid Content-Length")
+                    length = int(cl)
+                    if length > MAX_BODY_BYTES:
+                        raise HTTPError(413, "body too large")
+                    raw = await reader.readexactly(length) if length else b""
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError:
+                        raise HTTPError(400, "invalid JSON body")
+                    if not isinstance(body, dict):
+                        raise HTTPError(400, "JSON body must be an object")
+                    payload = await self.route(method.upper(), path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                    keep_alive = keep_alive and e.status != 413 and length >= 0
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                head = (
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                )
+                writer.write(head.encode("latin-1") + data)
+                await writer.drain()
+                if path not in ("/stats", "/health"):
+                    self.stats.add(path, (time.perf_counter() - t0) * 1000)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        self.batcher.start()
+        srv = await asyncio.start_server(self.handle, host, port)
+        print(f"VeriAI scoring service on http://{host}:{port}", flush=True)
+        try:
+            async with srv:
+                await srv.serve_forever()
+        finally:
+            await self.batcher.stop()
+            self.pool.shutdown(cancel_futures=True)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="VeriAI local scoring service")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    ap.add_argument("--max-batch", type=int, default=64, help="배치당 최대 문장 수")
+    ap.add_argument("--max-wait-ms", type=float, default=5.0, help="배치 수집 최대 대기시간(ms)")
+    args = ap.parse_args(argv)
+    server = ScoringServer(workers=args.workers, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+# verify.py — 문서 속 URL/DOI 실제 도달 여부 검증 → 근거 점수 반영
+# -----------------------------------------------------------------------------
+# rules는 URL 정규식이 맞기만 하면 has_url(+2 근거)을 준다. 죽은 링크도 근거로 잡히므로
+# 문서의 모든 URL/DOI를 동시에 확인하고, 살아 있는 링크가 없는 문장은 has_url/has_doi를
+# 끈 채로 특징을 다시 뽑아 engine.score_features로 위험도를 재계산한다.
+#  - 스레드 풀 + 호스트별 동시 요청 제한(세마포어) + 요청 타임아웃
+#  - HEAD 우선, 405/403/501이면 GET으로 재시도 (리다이렉트 추적)
+#  - 디스크 캐시(.cache/verify.json): 성공/HTTP 응답은 TTL, 네트워크 오류는 짧은 TTL
+#
+# 사용:
+#   python verify.py --text report.txt --ruleset report
+#   python scripts/verify_fixture.py        # 로컬 HTTP 서버로 동작 확인
+# -----------------------------------------------------------------------------
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+import rules
+
+CACHE_PATH = rules.ROOT / ".cache" / "verify.json"
+TTL = float(os.getenv("VERIAI_VERIFY_TTL", str(7 * 86400)))
+ERROR_TTL = float(os.getenv("VERIAI_VERIFY_ERROR_TTL", "3600"))
+DOI_RESOLVER = os.getenv("VERIAI_DOI_RESOLVER", "https://doi.org/")
+USER_AGENT = "VeriAI-link-check/1.0"
+
+_TRAILING = ".,;:!?)]}\"'”’>"
+_RETRY_WITH_GET = {403, 405, 501}
+
+# ====== Cache =====================================================================
+class LinkCache:
+    """target → 검사 결과 JSON 파일 캐시 (오류는 ERROR_TTL, 그 외는 TTL 동안 유효)."""
+
+    def __init__(self, path: Optional[Path] = CACHE_PATH, ttl: float = TTL, error_ttl: float = ERROR_TTL):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.lock = threading.Lock()
+        self.data: Dict[str, Dict[str, Any]] = {}
+        if self.path and self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.data = {}
+
+    def get(self, target: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            rec = self.data.get(target)
+        if rec is None:
+            return None
+        ttl = self.error_ttl if rec.get("error") else self.ttl
+        return rec if time.time() - rec.get("checked_at", 0) < ttl else None
+
+    def put(self, target: str, rec: Dict[str, Any]) -> None:
+        with self.lock:
+            self.data[target] = rec
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self.lock:
+            payload = json.dumps(self.data, ensure_ascii=False)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+# ====== Verifier ==================================================================
+class Verifier:
+    def __init__(self, *, cache: Optional[LinkCache] = None, timeout: float = 5.0, max_workers: int = 16,
+                 per_host: int = 2, doi_resolver: str = DOI_RESOLVER):
+        self.cache = cache if cache is not None else LinkCache()
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.doi_resolver = doi_resolver
+        self._sems: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = self._local.session = requests.Session()
+            s.headers["User-Agent"] = USER_AGENT
+        return s
+
+    def _host_sem(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = self._sems[host] = threading.Semaphore(self.per_host)
+            return sem
+
+    def url_of(self, target: str) -> str:
+        return self.doi_resolver + target[4:] if target.startswith("doi:") else target
+
+    def check(self, target: str) -> Dict[str, Any]:
+        """Resolve one URL or 'doi:<doi>' target (캐시 우선)."""
+        rec = self.cache.get(target)
+        if rec is not None:
+            return {**rec, "cached": True}
+        url = self.url_of(target)
+        rec = {"target": target, "url": url, "status": None, "ok": False, "redirected": False,
+               "final_url": None, "error": None}
+        t0 = time.perf_counter()
+        with self._host_sem(urlsplit(url).netloc.lower()):
+            try:
+                sess = self._session()
+                resp = sess.head(url, allow_redirects=True, timeout=self.timeout)
+                if resp.status_code in _RETRY_WITH_GET:
+                    resp = sess.get(url, allow_redirects=True, timeout=self.timeout, stream=True)
+                    resp.close()
+                rec.update(status=resp.status_code, ok=200 <= resp.status_code < 300,
+                           redirected=bool(resp.history), final_url=resp.url)
+            except requests.RequestException as e:
+                rec["error"] = type(e).__name__
+        rec["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        rec["checked_at"] = time.time()
+        self.cache.put(target, rec)
+        return {**rec, "cached": False}
+
+    def verify_all(self, targets: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Check unique targets concurrently and persist the cache."""
+        uniq = list(dict.fromkeys(targets))
+        if not uniq:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(uniq)), thread_name_prefix="veriai-verify") as pool:
+            results = dict(zip(uniq, pool.map(self.check, uniq)))
+        self.cache.save()
+        return results
+
+# ====== Document stage ============================================================
+def extract_targets(sentence: str, eng: "rules.RuleEngine") -> Tuple[List[str], List[str]]:
+    """(urls, dois as 'doi:<doi>') found by the ruleset's url/doi patterns."""
+    s = sentence.strip()
+    urls = [m.group(0).rstrip(_TRAILING) for m in eng.RX["url"].finditer(s)] if "url" in eng.RX else []
+    dois = []
+    if "doi" in eng.RX:
+        for m in eng.RX["doi"].finditer(s):
+            d = m.group(0).rstrip(_TRAILING)
+            if not any(d in u for u in urls):  # doi.org/… URL로 이미 확인하는 경우 제외
+                dois.append(f"doi:{d}")
+    return list(dict.fromkeys(urls)), list(dict.fromkeys(dois))
+
+def verify_rows(rows: List[Dict[str, Any]], ruleset: str, verifier: Optional[Verifier] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Verify links in scored rows; rows with links get link fields and a re-score.
+
+    살아 있는(2xx) 링크가 하나도 없는 문장은 has_url/has_doi 근거를 잃는다.
+    반환: (갱신된 rows, 요약 리포트)
+    """
+    eng = rules.get_engine(ruleset)
+    verifier = verifier or Verifier()
+    found = [extract_targets(str(r.get("sentence", "")), eng) for r in rows]
+    results = verifier.verify_all(t for urls, dois in found for t in urls + dois)
+
+    out: List[Dict[str, Any]] = []
+    changes = []
+    for i, (r, (urls, dois)) in enumerate(zip(rows, found)):
+        if not urls and not dois:
+            out.append(r)
+            continue
+        ind = {"has_url": any(results[u]["ok"] for u in urls)}
+        if "doi" in eng.RX:
+            ind["has_doi"] = any(results[d]["ok"] for d in dois)
+        f = eng.score_features(eng.extract_features(r["sentence"], with_hits=False, indicators=ind))
+        links = [{k: results[t][k] for k in ("target", "status", "ok", "redirected", "final_url", "error")} for t in urls + dois]
+        new = {**r, **f, "links": links,
+               "links_live": sum(1 for l in links if l["ok"]),
+               "links_dead": sum(1 for l in links if not l["ok"])}
+        if new["risk"] != r.get("risk"):
+            changes.append({"index": i, "sentence": r["sentence"], "prev_risk": r.get("risk"), "risk": new["risk"],
+                            "prev_label": r.get("label"), "label": new["label"]})
+        out.append(new)
+
+    recs = list(results.values())
+    report = {
+        "targets": len(recs),
+        "live": sum(1 for x in recs if x["ok"]),
+        "dead": sum(1 for x in recs if not x["ok"]),
+        "redirected": sum(1 for x in recs if x["redirected"]),
+        "cached": sum(1 for x in recs if x.get("cached")),
+        "risk_changes": changes,
+    }
+    return out, report
+
+def verify_text(text: str, ruleset: str = "report", verifier: Optional[Verifier] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    eng = rules.get_engine(ruleset)
+    return verify_rows(eng.score_batch(rules.split_sentences(text)), ruleset, verifier)
+
+# ====== CLI =======================================================================
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Verify URLs/DOIs in a document and re-score evidence")
+    ap.add_argument("--text", required=True, help="텍스트 파일")
+    ap.add_argument("--ruleset", default="report", choices=["ad", "report"])
+    ap.add_argument("--timeout", type=float, default=5.0)
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--per-host", type=int, default=2)
+    ap.add_argument("--cache", default=str(CACHE_PATH))
+    ap.add_argument("--json", help="갱신된 rows + 리포트를 저장할 경로")
+    args = ap.parse_args(argv)
+
+    v = Verifier(cache=LinkCache(args.cache), timeout=args.timeout, max_workers=args.workers, per_host=args.per_host)
+    t0 = time.perf_counter()
+    rows, rep = verify_text(Path(args.text).read_text(encoding="utf-8"), args.ruleset, v)
+    print(f"{rep['targets']} links in {time.perf_counter() - t0:.2f}s — live {rep['live']}, dead {rep['dead']}, "
+          f"redirected {rep['redirected']}, cached {rep['cached']}")
+    for r in rows:
+        for l in r.get("links", ()):
+            print(f"  {'OK ' if l['ok'] else 'BAD'} {l['status'] or l['error']!s:<22} {l['target']}")
+    for c in rep["risk_changes"]:
+        print(f"  risk {c['prev_risk']} → {c['risk']} ({c['prev_label']} → {c['label']}): {c['sentence'][:80]}")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"rows": rows, "report": rep}, ensure_ascii=False, indent=1, default=str), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()